@@ -8,19 +8,30 @@ Version 2.3
 import os
 import subprocess
 import sys
-import pandas as pd
+import importlib
+import importlib.util
 from datetime import datetime
-import tkinter as tk
-from tkinter import filedialog
 from tqdm.auto import tqdm
-import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
-import plotly.express as px
-import plotly.graph_objects as go
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
+import argparse
+import hashlib
+import glob
+import csv
+from collections import deque, Counter
+from contextlib import contextmanager
 import multiprocessing
-from functools import lru_cache
+import threading
+import queue
+import asyncio
+import sqlite3
+import json
+import stat
+import time
+import heapq
+import pathlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Optional
 import logging
 
 logging.basicConfig(
@@ -33,28 +44,1591 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# pandas e o dashboard (dash/plotly) levam segundos para importar; só são carregados quando
+# o relatório ou o dashboard são gerados, e não para a varredura
+dash = dcc = html = Input = Output = px = go = None
+
+def importar_dashboard():
+    global dash, dcc, html, Input, Output, px, go
+    if dash is None:
+        import dash as _dash
+        from dash import dcc as _dcc, html as _html
+        from dash.dependencies import Input as _Input, Output as _Output
+        import plotly.express as _px
+        import plotly.graph_objects as _go
+        dash, dcc, html, Input, Output, px, go = _dash, _dcc, _html, _Input, _Output, _px, _go
+
+TIPOS_PADRAO = ['.fls', '.lsproj', '.dwg', '.imp', '.rcp',
+                '.dxf', '.rvt', '.pts', '.e57', '.las', '.nwd', '.ptx']
+
+def normalizar_tipos(tipos):
+    normalizados = []
+    for tipo in tipos:
+        tipo = tipo.lower().strip()
+        if tipo:
+            tipo = '.' + tipo.lstrip('.')
+            if tipo not in normalizados:
+                normalizados.append(tipo)
+    return normalizados
+
+# No Windows o os.scandir já devolve tamanho e datas; DirEntry.stat() não vai ao disco
+STAT_GRATUITO = os.name == 'nt'
+# st_blocks (unidades de 512 bytes) só existe em sistemas POSIX
+ALOCACAO_DISPONIVEL = hasattr(os.stat_result, 'st_blocks')
+# Arquivo com pelo menos um bloco a menos alocado do que o tamanho lógico é marcado como esparso
+FOLGA_ESPARSO = 4096
+
+def extensao_arquivo(nome):
+    # Equivalente a os.path.splitext(nome.lower())[1], mas só baixa a caixa da extensão
+    ponto = nome.rfind('.')
+    if ponto <= 0 or (nome[0] == '.' and not nome[:ponto].lstrip('.')):
+        return ''
+    return nome[ponto:].lower()
+
+@dataclass
+class ResultadoPasta:
+    # Resultado de uma única travessia: tamanho, extensões, data do log Scan_ e WorkspaceData
+    caminho: str
+    tamanho_bytes: int = 0
+    arquivos_encontrados: dict = field(default_factory=dict)
+    data_log: Optional[str] = None
+    ctime_workspace: Optional[float] = None
+    erros: int = 0
+    arquivos: int = 0
+    # stat por arquivo listado; os das pastas (validação do cache, WorkspaceData) ficam à parte
+    chamadas_stat: int = 0
+    chamadas_stat_pastas: int = 0
+    bytes_duplicados: int = 0
+    bytes_alocados: int = 0
+    arquivos_esparsos: int = 0
+    # Medições da travessia (pastas listadas e segundos por fase); somadas em combinar,
+    # mas não guardadas no cache
+    pastas: int = 0
+    tempo_listagem: float = 0.0
+    tempo_stat: float = 0.0
+    tempo_classificacao: float = 0.0
+    tempo_logs: float = 0.0
+    # Arquivos com mais de um hardlink ainda "abertos": chave (st_dev, st_ino) -> (tamanho,
+    # st_nlink, links vistos). Quando todos os links aparecem na subárvore a chave é removida,
+    # então só ficam na memória os inodes cujos links atravessam a fronteira da pasta.
+    inodes: Optional[dict] = None
+
+    @property
+    def tamanho_gb(self):
+        return round(self.tamanho_bytes / (1024 ** 3), 2)
+
+    @property
+    def bytes_unicos(self):
+        return self.tamanho_bytes - self.bytes_duplicados
+
+    def registrar_link(self, chave, tamanho, nlink, vistos=1):
+        if self.inodes is None:
+            self.inodes = {}
+        atual = self.inodes.get(chave)
+        if atual is not None:
+            # O inode já foi somado uma vez nesta subárvore; o resto é duplicado
+            self.bytes_duplicados += tamanho
+            vistos += atual[2]
+        if vistos >= nlink:
+            self.inodes.pop(chave, None)
+        else:
+            self.inodes[chave] = (tamanho, nlink, vistos)
+
+    def combinar(self, outro):
+        self.tamanho_bytes += outro.tamanho_bytes
+        for ext, encontrado in outro.arquivos_encontrados.items():
+            if encontrado:
+                self.arquivos_encontrados[ext] = True
+        if self.data_log is None:
+            self.data_log = outro.data_log
+        self.erros += outro.erros
+        self.arquivos += outro.arquivos
+        self.chamadas_stat += outro.chamadas_stat
+        self.chamadas_stat_pastas += outro.chamadas_stat_pastas
+        self.bytes_duplicados += outro.bytes_duplicados
+        self.bytes_alocados += outro.bytes_alocados
+        self.arquivos_esparsos += outro.arquivos_esparsos
+        self.pastas += outro.pastas
+        self.tempo_listagem += outro.tempo_listagem
+        self.tempo_stat += outro.tempo_stat
+        self.tempo_classificacao += outro.tempo_classificacao
+        self.tempo_logs += outro.tempo_logs
+        if outro.inodes:
+            for chave, (tamanho, nlink, vistos) in outro.inodes.items():
+                self.registrar_link(chave, tamanho, nlink, vistos)
+        return self
+
+    def para_dict(self):
+        return {
+            'tamanho_bytes': self.tamanho_bytes,
+            'extensoes': [ext for ext, encontrado in self.arquivos_encontrados.items() if encontrado],
+            'data_log': self.data_log,
+            'ctime_workspace': self.ctime_workspace,
+            'erros': self.erros,
+            'arquivos': self.arquivos,
+            'bytes_duplicados': self.bytes_duplicados,
+            'bytes_alocados': self.bytes_alocados,
+            'arquivos_esparsos': self.arquivos_esparsos,
+            'inodes': [[chave, *valor] for chave, valor in self.inodes.items()] if self.inodes else None
+        }
+
+    @classmethod
+    def de_dict(cls, caminho, dados, tipos_arquivos):
+        extensoes = set(dados['extensoes'])
+        return cls(
+            caminho=caminho,
+            tamanho_bytes=dados['tamanho_bytes'],
+            arquivos_encontrados={tipo: tipo in extensoes for tipo in tipos_arquivos},
+            data_log=dados['data_log'],
+            ctime_workspace=dados['ctime_workspace'],
+            erros=dados['erros'],
+            arquivos=dados.get('arquivos', 0),
+            bytes_duplicados=dados.get('bytes_duplicados', 0),
+            bytes_alocados=dados.get('bytes_alocados', 0),
+            arquivos_esparsos=dados.get('arquivos_esparsos', 0),
+            inodes={chave: tuple(valor) for chave, *valor in dados['inodes']} if dados.get('inodes') else None
+        )
+
+class EstatisticasVarredura:
+    # Tempos e contagens por fase, por cliente e as pastas mais lentas, gravados em
+    # scan_stats.json. As fases da varredura são somadas entre os trabalhadores (tempo de
+    # thread); DataFrame, Excel e dashboard são medidos no relógio da thread principal.
+    FASES = ('listagem', 'stat', 'classificacao', 'logs_scan', 'dataframe', 'excel', 'parquet', 'dashboard')
+    MAIS_LENTAS = 20
+
+    def __init__(self, pasta_raiz=None, motor=None, trabalhadores=None, progresso=None):
+        self.trava = threading.Lock()
+        self.progresso = progresso
+        self.pasta_raiz = os.path.abspath(pasta_raiz) if pasta_raiz else pasta_raiz
+        self.motor = motor
+        self.trabalhadores = trabalhadores
+        self.inicio = datetime.now()
+        self._relogio = time.perf_counter()
+        self.duracao = None
+        self.fases = {fase: [0.0, 0] for fase in self.FASES}
+        self.pastas = self.arquivos = self.bytes = self.erros = 0
+        self.chamadas_stat = self.chamadas_stat_pastas = 0
+        self.mais_lentas = []
+        self.clientes = []
+        self.cache = None
+        self.caminho = None
+
+    def registrar_pasta(self, resultado):
+        # Recebe o resultado de um único diretório, antes de ser combinado com as filhas
+        segundos = (resultado.tempo_listagem + resultado.tempo_stat
+                    + resultado.tempo_classificacao + resultado.tempo_logs)
+        with self.trava:
+            fases = self.fases
+            fases['listagem'][0] += resultado.tempo_listagem
+            fases['listagem'][1] += resultado.pastas
+            fases['stat'][0] += resultado.tempo_stat
+            fases['stat'][1] += resultado.chamadas_stat + resultado.chamadas_stat_pastas
+            fases['classificacao'][0] += resultado.tempo_classificacao
+            fases['classificacao'][1] += resultado.arquivos
+            fases['logs_scan'][0] += resultado.tempo_logs
+            fases['logs_scan'][1] += resultado.pastas
+            self.pastas += resultado.pastas
+            self.arquivos += resultado.arquivos
+            self.bytes += resultado.tamanho_bytes
+            self.erros += resultado.erros
+            self.chamadas_stat += resultado.chamadas_stat
+            self.chamadas_stat_pastas += resultado.chamadas_stat_pastas
+            self._registrar_lenta((segundos, resultado.caminho, resultado.arquivos))
+            if self.progresso is not None:
+                self.progresso.atualizar(self.pastas, self.arquivos, self.bytes)
+
+    def _registrar_lenta(self, item):
+        # Heap de mínimo com as MAIS_LENTAS maiores; a mais rápida delas fica no topo
+        if len(self.mais_lentas) < self.MAIS_LENTAS:
+            heapq.heappush(self.mais_lentas, item)
+        elif item > self.mais_lentas[0]:
+            heapq.heapreplace(self.mais_lentas, item)
+
+    def registrar_cliente(self, nome, caminho, segundos, resultado=None):
+        cliente = {'cliente': nome, 'caminho': caminho, 'segundos': round(segundos, 6)}
+        if resultado is not None:
+            cliente.update({
+                'pastas': resultado.pastas,
+                'arquivos': resultado.arquivos,
+                'bytes': resultado.tamanho_bytes,
+                'erros': resultado.erros,
+                'fases': {
+                    'listagem': round(resultado.tempo_listagem, 6),
+                    'stat': round(resultado.tempo_stat, 6),
+                    'classificacao': round(resultado.tempo_classificacao, 6),
+                    'logs_scan': round(resultado.tempo_logs, 6)
+                }
+            })
+        with self.trava:
+            self.clientes.append(cliente)
+
+    def registrar_fase(self, fase, segundos, quantidade=1):
+        with self.trava:
+            self.fases[fase][0] += segundos
+            self.fases[fase][1] += quantidade
+
+    def mesclar(self, dados):
+        # Soma as medições de um processo trabalhador (motor 'processos')
+        with self.trava:
+            for fase, valores in dados['fases'].items():
+                self.fases[fase][0] += valores['segundos']
+                self.fases[fase][1] += valores['quantidade']
+            for chave in ('pastas', 'arquivos', 'bytes', 'erros', 'chamadas_stat', 'chamadas_stat_pastas'):
+                setattr(self, chave, getattr(self, chave) + dados[chave])
+            for pasta in dados['pastas_mais_lentas']:
+                self._registrar_lenta((pasta['segundos'], pasta['caminho'], pasta['arquivos']))
+            self.clientes.extend(dados['clientes'])
+            if self.progresso is not None:
+                self.progresso.atualizar(self.pastas, self.arquivos, self.bytes)
+        if dados['cache']:
+            self.registrar_cache(dados['cache']['acertos'], dados['cache']['falhas'])
+
+    def registrar_cache(self, acertos, falhas):
+        with self.trava:
+            if self.cache is None:
+                self.cache = {'acertos': 0, 'falhas': 0}
+            self.cache['acertos'] += acertos
+            self.cache['falhas'] += falhas
+
+    def concluir(self):
+        self.duracao = time.perf_counter() - self._relogio
+
+    def para_dict(self):
+        with self.trava:
+            duracao = self.duracao if self.duracao is not None else time.perf_counter() - self._relogio
+            return {
+                'pasta_raiz': self.pasta_raiz,
+                'inicio': self.inicio.isoformat(timespec='seconds'),
+                'motor': self.motor,
+                'trabalhadores': self.trabalhadores,
+                'duracao_segundos': round(duracao, 6),
+                'pastas': self.pastas,
+                'arquivos': self.arquivos,
+                'bytes': self.bytes,
+                'erros': self.erros,
+                'chamadas_stat': self.chamadas_stat,
+                'chamadas_stat_pastas': self.chamadas_stat_pastas,
+                'arquivos_por_segundo': round(self.arquivos / duracao, 1) if duracao else None,
+                'pastas_por_segundo': round(self.pastas / duracao, 1) if duracao else None,
+                'bytes_por_segundo': round(self.bytes / duracao, 1) if duracao else None,
+                'cache': self.cache,
+                'fases': {
+                    fase: {'segundos': round(segundos, 6), 'quantidade': quantidade}
+                    for fase, (segundos, quantidade) in self.fases.items()
+                },
+                'clientes': sorted(self.clientes, key=lambda c: c['segundos'], reverse=True),
+                'pastas_mais_lentas': [
+                    {'caminho': caminho, 'segundos': round(segundos, 6), 'arquivos': arquivos}
+                    for segundos, caminho, arquivos in sorted(self.mais_lentas, reverse=True)
+                ]
+            }
+
+    def salvar(self, caminho=None):
+        self.caminho = caminho or self.caminho
+        if self.caminho is None:
+            return
+        try:
+            with open(self.caminho, 'w', encoding='utf-8') as f:
+                json.dump(self.para_dict(), f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar {self.caminho}: {str(e)}")
+
+class ProgressoVarredura:
+    # Barra em pastas (e bytes na descrição) em vez de clientes. O total e a taxa inicial vêm
+    # do scan_stats.json da execução anterior; a taxa usada no ETA começa na anterior e
+    # converge para a medida, já que a execução anterior pesa como PESO_ANTERIOR segundos.
+    INTERVALO = 0.5
+    PESO_ANTERIOR = 30.0
+
+    def __init__(self, clientes, pastas_previstas=None, bytes_previstos=None, taxa_anterior=None):
+        self.clientes = clientes
+        self.clientes_concluidos = 0
+        self.bytes_previstos = bytes_previstos
+        self.taxa_anterior = taxa_anterior
+        self.pastas = self.arquivos = self.bytes = 0
+        self.inicio = self.ultima = time.perf_counter()
+        self.arquivos_ultima = 0
+        self.arquivos_por_segundo = 0.0
+        formato = None
+        if pastas_previstas:
+            formato = '{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} pastas [{elapsed}{postfix}]'
+        self.pbar = tqdm(total=pastas_previstas or None, desc="Varrendo pastas", unit=' pastas',
+                         bar_format=formato)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.atualizar(self.pastas, self.arquivos, self.bytes, forcar=True)
+        self.pbar.close()
+
+    def concluir_cliente(self):
+        self.clientes_concluidos += 1
+
+    def taxa_pastas(self, decorrido):
+        if self.taxa_anterior:
+            peso = self.PESO_ANTERIOR
+            return (self.pastas + self.taxa_anterior * peso) / (decorrido + peso)
+        return self.pastas / decorrido if decorrido else 0.0
+
+    def atualizar(self, pastas, arquivos, bytes_lidos, forcar=False):
+        # Chamado a cada pasta (sob a trava das estatísticas); só redesenha a cada INTERVALO
+        self.pastas, self.arquivos, self.bytes = pastas, arquivos, bytes_lidos
+        agora = time.perf_counter()
+        if not forcar and agora - self.ultima < self.INTERVALO:
+            return
+        self.arquivos_por_segundo = (arquivos - self.arquivos_ultima) / max(agora - self.ultima, 1e-9)
+        self.ultima, self.arquivos_ultima = agora, arquivos
+
+        total = self.pbar.total
+        if total is not None and pastas > total:
+            # A árvore cresceu desde a execução anterior
+            self.pbar.total = total = int(pastas * 1.05)
+        self.pbar.update(pastas - self.pbar.n)
+
+        partes = [f"clientes {self.clientes_concluidos}/{self.clientes}"]
+        if self.bytes_previstos:
+            partes.append(f"{bytes_lidos / 1024 ** 3:.1f}/{self.bytes_previstos / 1024 ** 3:.1f} GB")
+        else:
+            partes.append(f"{bytes_lidos / 1024 ** 3:.1f} GB")
+        partes.append(f"{self.arquivos_por_segundo:,.0f} arquivos/s")
+        taxa = self.taxa_pastas(agora - self.inicio)
+        if total is not None and taxa > 0:
+            restante = int(max(total - pastas, 0) / taxa)
+            partes.append(f"ETA {restante // 3600:d}:{restante % 3600 // 60:02d}:{restante % 60:02d}")
+        self.pbar.set_postfix_str(', '.join(partes), refresh=False)
+        self.pbar.refresh()
+
+class PerfilExecucao:
+    # --profile: 'cprofile' é determinístico e grava .pstats; 'amostragem' lê a pilha de todas
+    # as threads a cada intervalo (sys._current_frames) e grava pilhas colapsadas para
+    # flamegraph.pl/speedscope, com custo baixo o bastante para ficar ligado em produção.
+    # Os arquivos são reescritos ao fim de cada fase, então o dashboard também é coberto.
+    MODOS = ('cprofile', 'amostragem')
+
+    def __init__(self, modo, local_saida, intervalo=0.01):
+        self.modo = modo
+        self.intervalo = intervalo
+        self.trava = threading.Lock()
+        # Sem fase ativa o amostrador fica parado nesta condição em vez de acordar a cada intervalo
+        self.fase_iniciada = threading.Condition(self.trava)
+        prefixo = os.path.join(local_saida or '.', f"perfil_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.caminho = prefixo + ('.pstats' if modo == 'cprofile' else '.collapsed')
+        self.stats = None
+        self.perfis_threads = []
+        self.pilhas = Counter()
+        self.fases_ativas = Counter()
+        self.amostrador = None
+
+    @contextmanager
+    def fase(self, nome):
+        if self.modo is None:
+            yield
+            return
+        contexto = self._cprofile() if self.modo == 'cprofile' else self._amostragem(nome)
+        try:
+            with contexto:
+                yield
+        finally:
+            self.salvar()
+
+    @contextmanager
+    def _cprofile(self):
+        import cProfile
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Python 3.12+: o cProfile já cobre todas as threads e não aceita uma segunda
+            # instância ativa (ex.: callbacks simultâneos do dashboard)
+            yield
+            return
+        # Até o Python 3.11 o cProfile só mede a thread que o ativou; as threads criadas
+        # durante a fase (trabalhadores da varredura) ligam o próprio perfil
+        multithread = sys.version_info < (3, 12)
+        if multithread:
+            threading.setprofile(self._perfilar_thread)
+        try:
+            yield
+        finally:
+            perfil.disable()
+            if multithread:
+                threading.setprofile(None)
+            with self.trava:
+                perfis, self.perfis_threads = [perfil, *self.perfis_threads], []
+                self._acumular(perfis)
+
+    def _perfilar_thread(self, *args):
+        import cProfile
+        perfil = cProfile.Profile()
+        with self.trava:
+            self.perfis_threads.append(perfil)
+        perfil.enable()
+
+    def _acumular(self, perfis):
+        import pstats
+        for perfil in perfis:
+            if self.stats is None:
+                self.stats = pstats.Stats(perfil)
+            else:
+                self.stats.add(perfil)
+
+    @contextmanager
+    def _amostragem(self, nome):
+        with self.trava:
+            self.fases_ativas[nome] += 1
+            self.fase_iniciada.notify()
+            if self.amostrador is None:
+                self.amostrador = threading.Thread(target=self._amostrar, name='amostrador-perfil', daemon=True)
+                self.amostrador.start()
+        try:
+            yield
+        finally:
+            with self.trava:
+                self.fases_ativas[nome] -= 1
+                if not self.fases_ativas[nome]:
+                    del self.fases_ativas[nome]
+
+    def _amostrar(self):
+        proprio = threading.get_ident()
+        while True:
+            with self.fase_iniciada:
+                self.fase_iniciada.wait_for(lambda: self.fases_ativas)
+            time.sleep(self.intervalo)
+            with self.trava:
+                if not self.fases_ativas:
+                    continue
+                fase = ';'.join(sorted(self.fases_ativas))
+            nomes_threads = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == proprio:
+                    continue
+                pilha = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    pilha.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+                    frame = frame.f_back
+                pilha.append(nomes_threads.get(ident, str(ident)))
+                pilha.append(fase)
+                chave = ';'.join(reversed(pilha))
+                with self.trava:
+                    self.pilhas[chave] += 1
+
+    def salvar(self):
+        try:
+            with self.trava:
+                if self.modo == 'cprofile':
+                    if self.stats is not None:
+                        self.stats.dump_stats(self.caminho)
+                else:
+                    with open(self.caminho, 'w', encoding='utf-8') as f:
+                        for pilha, amostras in sorted(self.pilhas.items()):
+                            f.write(f"{pilha} {amostras}\n")
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o perfil {self.caminho}: {str(e)}")
+
+class CacheVarredura:
+    # Cache em SQLite do conteúdo direto de cada diretório, validado por st_mtime/st_ino.
+    # Se o diretório não mudou, a listagem e os stats dos arquivos são reaproveitados e
+    # só as subpastas continuam sendo verificadas. Alterar o conteúdo de um arquivo sem
+    # criar, remover ou renomear entradas não muda o mtime da pasta e não é detectado;
+    # idade_maxima_dias força uma nova listagem de entradas varridas há mais tempo que isso.
+    TAMANHO_LOTE = 500
+    # Incrementar quando os campos guardados de ResultadoPasta mudarem
+    VERSAO = 2
+
+    def __init__(self, caminho_banco, tipos_arquivos, execucao, deduplicar_hardlinks=False,
+                 idade_maxima_dias=None):
+        self.caminho_banco = caminho_banco
+        self.tipos_arquivos = list(tipos_arquivos)
+        self.assinatura = f"v{self.VERSAO}|" + ','.join(sorted(self.tipos_arquivos)) + ('|hardlinks' if deduplicar_hardlinks else '')
+        self.execucao = execucao
+        self.varrido_apos = time.time() - idade_maxima_dias * 86400 if idade_maxima_dias else 0
+        self.trava = threading.Lock()
+        self.gravacoes = []
+        self.acertos_pendentes = []
+        self.acertos = 0
+        self.falhas = 0
+        self.conexao = sqlite3.connect(caminho_banco, timeout=60, check_same_thread=False)
+        self.conexao.execute('PRAGMA journal_mode=WAL')
+        self.conexao.execute('PRAGMA synchronous=NORMAL')
+        self.conexao.execute('''
+            CREATE TABLE IF NOT EXISTS diretorios (
+                caminho TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                assinatura TEXT NOT NULL,
+                execucao TEXT NOT NULL,
+                dados TEXT NOT NULL,
+                varrido_em REAL NOT NULL DEFAULT 0
+            )
+        ''')
+        colunas = {linha[1] for linha in self.conexao.execute('PRAGMA table_info(diretorios)')}
+        if 'varrido_em' not in colunas:
+            # Caches anteriores à coluna contam como varridos há muito tempo
+            self.conexao.execute('ALTER TABLE diretorios ADD COLUMN varrido_em REAL NOT NULL DEFAULT 0')
+        self.conexao.commit()
+
+    def buscar(self, caminho, stat_dir):
+        with self.trava:
+            linha = self.conexao.execute(
+                'SELECT mtime_ns, inode, assinatura, dados, varrido_em FROM diretorios WHERE caminho = ?',
+                (caminho,)
+            ).fetchone()
+            if (linha is None or linha[0] != stat_dir.st_mtime_ns
+                    or linha[1] != stat_dir.st_ino or linha[2] != self.assinatura
+                    or linha[4] < self.varrido_apos):
+                self.falhas += 1
+                return None
+            self.acertos += 1
+            self.acertos_pendentes.append((self.execucao, caminho))
+            if len(self.acertos_pendentes) >= self.TAMANHO_LOTE:
+                self._gravar_lote()
+        dados = json.loads(linha[3])
+        resultado = ResultadoPasta.de_dict(caminho, dados['resultado'], self.tipos_arquivos)
+        subpastas = [(nome, os.path.join(caminho, nome), is_symlink) for nome, is_symlink in dados['subpastas']]
+        return resultado, subpastas
+
+    def guardar(self, caminho, stat_dir, resultado, subpastas):
+        dados = json.dumps({
+            'resultado': resultado.para_dict(),
+            'subpastas': [(nome, is_symlink) for nome, _, is_symlink in subpastas]
+        }, ensure_ascii=False)
+        with self.trava:
+            self.gravacoes.append((caminho, stat_dir.st_mtime_ns, stat_dir.st_ino,
+                                   self.assinatura, self.execucao, dados, time.time()))
+            if len(self.gravacoes) >= self.TAMANHO_LOTE:
+                self._gravar_lote()
+
+    def _gravar_lote(self):
+        if self.gravacoes:
+            self.conexao.executemany(
+                'INSERT OR REPLACE INTO diretorios VALUES (?, ?, ?, ?, ?, ?, ?)', self.gravacoes
+            )
+            self.gravacoes = []
+        if self.acertos_pendentes:
+            self.conexao.executemany(
+                'UPDATE diretorios SET execucao = ? WHERE caminho = ?', self.acertos_pendentes
+            )
+            self.acertos_pendentes = []
+        self.conexao.commit()
+
+    def fechar(self, pasta_raiz=None, preservar=()):
+        with self.trava:
+            try:
+                self._gravar_lote()
+                if pasta_raiz is not None:
+                    # Subárvores em preservar (clientes recuperados do journal) não foram
+                    # visitadas nesta execução, mas continuam existindo
+                    for caminho in preservar:
+                        prefixo = os.path.join(caminho, '')
+                        self.conexao.execute(
+                            'UPDATE diretorios SET execucao = ? '
+                            'WHERE caminho = ? OR substr(caminho, 1, ?) = ?',
+                            (self.execucao, caminho, len(prefixo), prefixo)
+                        )
+                    # Remove diretórios que não existem mais sob a raiz auditada
+                    raiz = os.path.join(pasta_raiz, '')
+                    self.conexao.execute(
+                        'DELETE FROM diretorios WHERE execucao != ? AND substr(caminho, 1, ?) = ?',
+                        (self.execucao, len(raiz), raiz)
+                    )
+                    self.conexao.commit()
+            finally:
+                self.conexao.close()
+
+class JournalAuditoria:
+    # Registro só de acréscimo: cada cliente concluído vira uma linha JSON gravada com fsync,
+    # para que uma falha ou Ctrl+C perto do fim não custe a auditoria inteira (--resume).
+    # O cabeçalho leva tudo o que muda as colunas das linhas gravadas
+    VERSAO = 2
+
+    def __init__(self, caminho, pasta_raiz, tipos_arquivos, deduplicar_hardlinks=False):
+        self.caminho = caminho
+        self.cabecalho = {
+            'tipo': 'inicio',
+            'versao': self.VERSAO,
+            'pasta_raiz': os.path.abspath(pasta_raiz),
+            'tipos_arquivos': list(tipos_arquivos),
+            'deduplicar_hardlinks': deduplicar_hardlinks
+        }
+        self.trava = threading.Lock()
+        self.arquivo = None
+
+    def carregar(self):
+        concluidos = {}
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                cabecalho = json.loads(f.readline() or '{}')
+                if {k: cabecalho.get(k) for k in self.cabecalho} != self.cabecalho:
+                    logger.warning("Journal de outra auditoria (raiz, tipos ou opções diferentes); começando do zero")
+                    return {}
+                for linha in f:
+                    try:
+                        registro = json.loads(linha)
+                    except json.JSONDecodeError:
+                        # Última linha cortada pela interrupção
+                        break
+                    if registro.get('tipo') == 'cliente':
+                        concluidos[registro['caminho']] = registro['linhas']
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Não foi possível ler o journal {self.caminho}: {str(e)}")
+        return concluidos
+
+    def abrir(self, concluidos=None):
+        # Reescreve o journal só com os registros válidos antes de voltar a acrescentar
+        temporario = self.caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.cabecalho, ensure_ascii=False) + '\n')
+            for caminho, linhas in (concluidos or {}).items():
+                f.write(self._serializar(caminho, linhas))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho)
+        self.arquivo = open(self.caminho, 'a', encoding='utf-8')
+
+    @staticmethod
+    def _serializar(caminho, linhas):
+        return json.dumps({'tipo': 'cliente', 'caminho': caminho, 'linhas': linhas}, ensure_ascii=False) + '\n'
+
+    def registrar(self, caminho, linhas):
+        registro = self._serializar(caminho, linhas)
+        with self.trava:
+            if self.arquivo is None:
+                return
+            self.arquivo.write(registro)
+            self.arquivo.flush()
+            os.fsync(self.arquivo.fileno())
+
+    def fechar(self):
+        with self.trava:
+            if self.arquivo is not None:
+                self.arquivo.close()
+                self.arquivo = None
+
+    def descartar(self):
+        self.fechar()
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
+
+class BancoResultados:
+    # Histórico das auditorias em SQLite para consultas entre execuções, por exemplo o
+    # tamanho de um cliente em cada uma das últimas auditorias. A varredura só enfileira as
+    # linhas de cada cliente; uma thread própria converte e grava em lotes (executemany),
+    # então a varredura nunca espera pelo banco.
+    TAMANHO_LOTE = 1000
+
+    def __init__(self, caminho_banco, tipos_arquivos, somente_leitura=False):
+        self.caminho_banco = caminho_banco
+        self.tipos_arquivos = list(tipos_arquivos)
+        self.somente_leitura = somente_leitura
+        self.fila = queue.Queue()
+        self.thread = None
+        self.execucao_id = None
+        self.total_linhas = 0
+        self.falhou = False
+        if not somente_leitura:
+            self.criar_tabelas()
+
+    def criar_tabelas(self):
+        conexao = self.conectar()
+        try:
+            historico_novo = conexao.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'historico_clientes'"
+            ).fetchone() is None
+            conexao.executescript('''
+                CREATE TABLE IF NOT EXISTS execucoes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    execucao TEXT NOT NULL,
+                    pasta_raiz TEXT NOT NULL,
+                    motor TEXT,
+                    tipos_arquivos TEXT NOT NULL,
+                    inicio TEXT NOT NULL,
+                    fim TEXT,
+                    linhas INTEGER,
+                    status TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS resultados (
+                    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+                    cliente TEXT NOT NULL,
+                    pasta TEXT NOT NULL,
+                    caminho TEXT NOT NULL,
+                    subpasta INTEGER NOT NULL,
+                    data_criacao TEXT,
+                    precisa_verificar INTEGER NOT NULL,
+                    tamanho_bytes INTEGER,
+                    tamanho_unico_gb REAL,
+                    tamanho_alocado_gb REAL,
+                    arquivos_esparsos INTEGER,
+                    extensoes TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_execucoes_raiz ON execucoes (pasta_raiz, inicio);
+                CREATE INDEX IF NOT EXISTS idx_resultados_execucao ON resultados (execucao_id);
+                CREATE INDEX IF NOT EXISTS idx_resultados_cliente ON resultados (cliente, execucao_id);
+                CREATE INDEX IF NOT EXISTS idx_resultados_caminho ON resultados (caminho, execucao_id);
+                CREATE TABLE IF NOT EXISTS historico_clientes (
+                    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+                    cliente TEXT NOT NULL,
+                    tamanho_bytes INTEGER,
+                    PRIMARY KEY (execucao_id, cliente)
+                ) WITHOUT ROWID;
+            ''')
+            if historico_novo:
+                # Série compacta (um ponto por cliente e execução) para o histórico de crescimento
+                conexao.execute(
+                    'INSERT OR IGNORE INTO historico_clientes '
+                    'SELECT execucao_id, cliente, tamanho_bytes FROM resultados WHERE subpasta = 0'
+                )
+            conexao.commit()
+        finally:
+            conexao.close()
+
+    def conectar(self):
+        if self.somente_leitura:
+            # Consultas (--diff) não criam tabelas, não fazem o backfill do histórico nem gravam
+            uri = pathlib.Path(os.path.abspath(self.caminho_banco)).as_uri() + '?mode=ro'
+            return sqlite3.connect(uri, uri=True, timeout=60)
+        conexao = sqlite3.connect(self.caminho_banco, timeout=60)
+        conexao.execute('PRAGMA journal_mode=WAL')
+        conexao.execute('PRAGMA synchronous=NORMAL')
+        return conexao
+
+    def abrir(self, execucao, pasta_raiz, motor):
+        conexao = self.conectar()
+        try:
+            cursor = conexao.execute(
+                'INSERT INTO execucoes (execucao, pasta_raiz, motor, tipos_arquivos, inicio, status) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (execucao, os.path.abspath(pasta_raiz), motor, json.dumps(self.tipos_arquivos),
+                 datetime.now().isoformat(timespec='seconds'), 'em andamento')
+            )
+            conexao.commit()
+            self.execucao_id = cursor.lastrowid
+        finally:
+            conexao.close()
+        self.thread = threading.Thread(target=self._gravar, name='banco-resultados', daemon=True)
+        self.thread.start()
+
+    def registrar(self, linhas):
+        # A primeira linha de cada lote é a do cliente; as demais, suas subpastas
+        if linhas and self.thread is not None:
+            self.fila.put(linhas)
+
+    @staticmethod
+    def _data_iso(data):
+        try:
+            return datetime.strptime(data, '%d/%m/%Y').date().isoformat()
+        except (TypeError, ValueError):
+            return None
+
+    def _converter(self, linhas):
+        cliente = linhas[0]['Cliente']
+        return [
+            (self.execucao_id, cliente, linha['Cliente'], os.path.abspath(linha['Caminho']), int(i > 0),
+             self._data_iso(linha.get('Data Criação')), int(bool(linha.get('Precisa Verificar'))),
+             linha.get('Tamanho Total (bytes)'), linha.get('Tamanho Único (GB)'),
+             linha.get('Tamanho Alocado (GB)'), linha.get('Arquivos Esparsos'),
+             ','.join(tipo for tipo in self.tipos_arquivos if linha.get(tipo) == 'Sim'))
+            for i, linha in enumerate(linhas)
+        ]
+
+    def _gravar(self):
+        conexao = self.conectar()
+        pendentes = []
+
+        def gravar_lote():
+            conexao.executemany('INSERT INTO resultados VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', pendentes)
+            conexao.executemany(
+                'INSERT OR REPLACE INTO historico_clientes VALUES (?, ?, ?)',
+                [(linha[0], linha[1], linha[7]) for linha in pendentes if not linha[4]]
+            )
+            conexao.commit()
+            self.total_linhas += len(pendentes)
+            pendentes.clear()
+
+        try:
+            while True:
+                linhas = self.fila.get()
+                if linhas is None:
+                    break
+                pendentes.extend(self._converter(linhas))
+                if len(pendentes) >= self.TAMANHO_LOTE:
+                    gravar_lote()
+            gravar_lote()
+        except sqlite3.Error as e:
+            self.falhou = True
+            logger.error(f"Erro ao gravar no banco de resultados {self.caminho_banco}: {str(e)}")
+        finally:
+            conexao.close()
+
+    def fechar(self, status='concluida'):
+        if self.thread is None:
+            return
+        self.fila.put(None)
+        self.thread.join()
+        self.thread = None
+        conexao = self.conectar()
+        try:
+            conexao.execute(
+                'UPDATE execucoes SET fim = ?, linhas = ?, status = ? WHERE id = ?',
+                (datetime.now().isoformat(timespec='seconds'), self.total_linhas,
+                 'incompleta' if self.falhou else status, self.execucao_id)
+            )
+            conexao.commit()
+        finally:
+            conexao.close()
+
+    def execucoes_recentes(self, pasta_raiz=None, quantidade=2):
+        # Só execuções concluídas, da mais recente para a mais antiga
+        filtro, parametros = ('AND pasta_raiz = ?', [os.path.abspath(pasta_raiz)]) if pasta_raiz else ('', [])
+        conexao = self.conectar()
+        try:
+            return [linha[0] for linha in conexao.execute(
+                f"SELECT id FROM execucoes WHERE status = 'concluida' {filtro} ORDER BY id DESC LIMIT ?",
+                (*parametros, quantidade)
+            )]
+        finally:
+            conexao.close()
+
+    def ler_execucao(self, execucao_id):
+        # caminho -> (cliente, pasta, subpasta, bytes, extensões), pronto para o hash join
+        conexao = self.conectar()
+        try:
+            info = conexao.execute(
+                'SELECT pasta_raiz, inicio, status FROM execucoes WHERE id = ?', (execucao_id,)
+            ).fetchone()
+            if info is None:
+                raise ValueError(f"Execução {execucao_id} não existe em {self.caminho_banco}")
+            cursor = conexao.execute(
+                'SELECT caminho, cliente, pasta, subpasta, tamanho_bytes, extensoes '
+                'FROM resultados WHERE execucao_id = ?', (execucao_id,)
+            )
+            return info, {linha[0]: linha[1:] for linha in cursor}
+        finally:
+            conexao.close()
+
+def comparar_execucoes(antes, depois):
+    # Hash join pelo caminho entre duas execuções lidas com ler_execucao; pastas sem mudança
+    # de tamanho nem de extensões ficam de fora. Ordena pela variação absoluta em bytes.
+    diferencas = []
+
+    def adicionar(caminho, cliente, pasta, subpasta, situacao, bytes_antes, bytes_depois,
+                  adicionadas, removidas):
+        variacao = (bytes_depois or 0) - (bytes_antes or 0)
+        diferencas.append({
+            'Cliente': cliente,
+            'Pasta': pasta,
+            'Nível': 'Subpasta' if subpasta else 'Cliente',
+            'Situação': situacao,
+            'Bytes Antes': bytes_antes,
+            'Bytes Depois': bytes_depois,
+            'Variação (bytes)': variacao,
+            'Variação (GB)': round(variacao / (1024 ** 3), 2),
+            'Extensões Adicionadas': adicionadas,
+            'Extensões Removidas': removidas,
+            'Caminho': caminho
+        })
+
+    for caminho, (cliente, pasta, subpasta, bytes_depois, extensoes_depois) in depois.items():
+        anterior = antes.get(caminho)
+        if anterior is None:
+            adicionar(caminho, cliente, pasta, subpasta, 'nova', None, bytes_depois, extensoes_depois, '')
+            continue
+        bytes_antes, extensoes_antes = anterior[3], anterior[4]
+        if bytes_antes == bytes_depois and extensoes_antes == extensoes_depois:
+            continue
+        adicionadas = removidas = ''
+        if extensoes_antes != extensoes_depois:
+            conjunto_antes = set(filter(None, extensoes_antes.split(',')))
+            conjunto_depois = set(filter(None, extensoes_depois.split(',')))
+            adicionadas = ','.join(sorted(conjunto_depois - conjunto_antes))
+            removidas = ','.join(sorted(conjunto_antes - conjunto_depois))
+        adicionar(caminho, cliente, pasta, subpasta, 'alterada', bytes_antes, bytes_depois,
+                  adicionadas, removidas)
+
+    for caminho, (cliente, pasta, subpasta, bytes_antes, extensoes_antes) in antes.items():
+        if caminho not in depois:
+            adicionar(caminho, cliente, pasta, subpasta, 'removida', bytes_antes, None, '', extensoes_antes)
+
+    diferencas.sort(key=lambda d: abs(d['Variação (bytes)']), reverse=True)
+    return diferencas
+
+def gerar_diferenca(caminho_banco, local_saida, execucoes=None, pasta_raiz=None):
+    if not os.path.exists(caminho_banco):
+        raise FileNotFoundError(f"Banco de resultados não encontrado: {caminho_banco}")
+    banco = BancoResultados(caminho_banco, [], somente_leitura=True)
+    if not execucoes:
+        execucoes = banco.execucoes_recentes(pasta_raiz)[::-1]
+        if len(execucoes) < 2:
+            raise ValueError("São necessárias duas execuções concluídas para comparar")
+    antiga, nova = execucoes
+
+    inicio = time.perf_counter()
+    info_antes, antes = banco.ler_execucao(antiga)
+    info_depois, depois = banco.ler_execucao(nova)
+    if info_antes[0] != info_depois[0]:
+        logger.warning(f"Execuções de raízes diferentes: {info_antes[0]} e {info_depois[0]}")
+    diferencas = comparar_execucoes(antes, depois)
+    logger.info(
+        f"Diferença entre a execução {antiga} ({info_antes[1]}, {len(antes)} pastas) e a {nova} "
+        f"({info_depois[1]}, {len(depois)} pastas) em {time.perf_counter() - inicio:.2f}s"
+    )
+
+    situacoes = Counter(d['Situação'] for d in diferencas)
+    variacao = sum(d['Variação (bytes)'] for d in diferencas if d['Nível'] == 'Cliente')
+    logger.info(
+        f"{situacoes['nova']} pastas novas, {situacoes['removida']} removidas, "
+        f"{situacoes['alterada']} alteradas; variação total dos clientes: {variacao / 1024 ** 3:+.2f} GB"
+    )
+    for d in diferencas[:10]:
+        logger.info(f"  {d['Variação (GB)']:+10.2f} GB  {d['Situação']:<9} {d['Pasta']}")
+
+    nome_raiz = os.path.basename(os.path.normpath(info_depois[0]))
+    caminho_arquivo = os.path.join(local_saida, f"Diferenca_{nome_raiz}_{antiga}_{nova}.csv")
+    with open(caminho_arquivo, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=[
+            'Cliente', 'Pasta', 'Nível', 'Situação', 'Bytes Antes', 'Bytes Depois', 'Variação (bytes)',
+            'Variação (GB)', 'Extensões Adicionadas', 'Extensões Removidas', 'Caminho'
+        ])
+        escritor.writeheader()
+        escritor.writerows(diferencas)
+    logger.info(f"Diferença gravada em: {caminho_arquivo}")
+    return caminho_arquivo
+
+class HistoricoCrescimento:
+    # Tamanho de cada cliente em cada execução concluída da mesma raiz, em arrays NumPy
+    # (clientes x execuções, NaN onde o cliente não existia), mais a soma do compartilhamento.
+    # Os ajustes linear e exponencial (reta sobre o log) são feitos de uma vez para todas as
+    # séries por mínimos quadrados; fica o de menor erro. Projeções e datas de cruzamento da
+    # capacidade são calculadas aqui, e o dashboard só indexa os arrays prontos.
+    TOTAL = 'Total do compartilhamento'
+    HORIZONTE_DIAS = 365
+    PONTOS_PROJECAO = 53
+
+    def __init__(self, caminho_banco, pasta_raiz, capacidade_cliente_gb=None, capacidade_total_gb=None):
+        import numpy as np
+        self.np = np
+        conexao = sqlite3.connect(caminho_banco, timeout=60)
+        try:
+            registros = conexao.execute(
+                'SELECT e.id, e.inicio, h.cliente, h.tamanho_bytes FROM historico_clientes h '
+                'JOIN execucoes e ON e.id = h.execucao_id '
+                "WHERE e.status = 'concluida' AND e.pasta_raiz = ? ORDER BY e.id",
+                (os.path.abspath(pasta_raiz),)
+            ).fetchall()
+        finally:
+            conexao.close()
+
+        ids = np.array([r[0] for r in registros], dtype=np.int64)
+        nomes = np.array([r[2] for r in registros], dtype=object)
+        execucoes, indice_execucao, posicao = np.unique(ids, return_index=True, return_inverse=True)[:3]
+        clientes, indice_cliente = np.unique(nomes, return_inverse=True)
+        tamanhos = np.full((len(clientes) + 1, len(execucoes)), np.nan)
+        tamanhos[indice_cliente, posicao] = np.array([r[3] for r in registros], dtype=float)
+        tamanhos[-1] = np.nansum(tamanhos[:-1], axis=0)
+
+        self.nomes = [*clientes.tolist(), self.TOTAL]
+        self.linha = {nome: i for i, nome in enumerate(self.nomes)}
+        self.datas = np.array([registros[i][1] for i in indice_execucao], dtype='datetime64[s]')
+        self.tamanhos = tamanhos
+        capacidade_cliente = capacidade_cliente_gb * 1024 ** 3 if capacidade_cliente_gb else np.nan
+        capacidade_total = capacidade_total_gb * 1024 ** 3 if capacidade_total_gb else np.nan
+        self.capacidades = np.append(np.full(len(clientes), capacidade_cliente), capacidade_total)
+        # Com menos de duas execuções não há tendência a ajustar
+        if self.execucoes >= 2:
+            self.ajustar()
+
+    @property
+    def execucoes(self):
+        return len(self.datas)
+
+    def _reta(self, dias, valores, validos):
+        # Mínimos quadrados por linha com máscara: y = a + b * t
+        np = self.np
+        n = validos.sum(axis=1)
+        t = np.where(validos, dias, 0.0)
+        y = np.where(validos, valores, 0.0)
+        soma_t, soma_y = t.sum(axis=1), y.sum(axis=1)
+        denominador = n * (t * t).sum(axis=1) - soma_t ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            b = np.where(denominador > 0, (n * (t * y).sum(axis=1) - soma_t * soma_y) / denominador, np.nan)
+            a = (soma_y - b * soma_t) / n
+        return a, b
+
+    def ajustar(self):
+        np = self.np
+        dias = (self.datas - self.datas[0]) / np.timedelta64(1, 'D')
+        y = self.tamanhos
+        validos = ~np.isnan(y)
+        positivos = validos & (y > 0)
+
+        a_lin, b_lin = self._reta(dias, y, validos)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            a_exp, b_exp = self._reta(dias, np.log(np.where(positivos, y, 1.0)), positivos)
+            erro_lin = np.where(validos, (y - (a_lin[:, None] + b_lin[:, None] * dias)) ** 2, 0).sum(axis=1)
+            erro_exp = np.where(validos, (y - np.exp(a_exp[:, None] + b_exp[:, None] * dias)) ** 2, 0).sum(axis=1)
+        # O exponencial precisa de três pontos, todos positivos
+        pontos = validos.sum(axis=1)
+        self.exponencial = ((pontos >= 3) & (positivos.sum(axis=1) == pontos)
+                            & np.isfinite(erro_exp) & (erro_exp < erro_lin))
+        self.coeficientes = np.where(self.exponencial[:, None], np.c_[a_exp, b_exp], np.c_[a_lin, b_lin])
+        a, b = self.coeficientes[:, 0], self.coeficientes[:, 1]
+
+        # Último valor conhecido de cada série, que pode ter parado antes da última execução
+        ultimo_indice = y.shape[1] - 1 - np.argmax(validos[:, ::-1], axis=1)
+        self.ultimo_tamanho = np.where(pontos > 0, y[np.arange(len(y)), ultimo_indice], np.nan)
+        self.excedida = self.ultimo_tamanho >= self.capacidades
+
+        ultimo_dia = dias[-1]
+        self.dias_projecao = np.linspace(ultimo_dia, ultimo_dia + self.HORIZONTE_DIAS, self.PONTOS_PROJECAO)
+        self.datas_projecao = self.datas[0] + (self.dias_projecao * 86400).astype('timedelta64[s]')
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            t = self.dias_projecao
+            self.projecoes = np.where(self.exponencial[:, None], np.exp(a[:, None] + b[:, None] * t),
+                                      a[:, None] + b[:, None] * t)
+            # Dia em que a curva ajustada chega à capacidade; NaN se não cresce ou não há capacidade
+            alvo = np.where(self.exponencial, np.log(self.capacidades), self.capacidades)
+            dia_cruzamento = np.where(b > 0, (alvo - a) / b, np.nan)
+        dia_cruzamento = np.where(self.excedida, ultimo_dia, np.maximum(dia_cruzamento, ultimo_dia))
+        # Cruzamentos além de um século não cabem em datetime64 com folga e não interessam
+        finitos = np.isfinite(dia_cruzamento) & (dia_cruzamento < ultimo_dia + 36500)
+        self.cruzamento = np.full(len(y), np.datetime64('NaT'), dtype='datetime64[s]')
+        self.cruzamento[finitos] = self.datas[0] + (dia_cruzamento[finitos] * 86400).astype('timedelta64[s]')
+
+    def previsao(self, nome):
+        i = self.linha.get(nome)
+        if self.execucoes < 2 or i is None or self.np.isnan(self.coeficientes[i, 1]):
+            return None
+        return {
+            'nome': nome,
+            'datas': self.datas,
+            'tamanhos_gb': self.tamanhos[i] / 1024 ** 3,
+            'datas_projecao': self.datas_projecao,
+            'projecao_gb': self.projecoes[i] / 1024 ** 3,
+            'modelo': 'exponencial' if self.exponencial[i] else 'linear',
+            'capacidade_gb': self.capacidades[i] / 1024 ** 3,
+            'cruzamento': self.cruzamento[i],
+            'excedida': bool(self.excedida[i])
+        }
+
+    def registrar_previsoes(self, limite=10):
+        # Séries que cruzam a capacidade dentro do horizonte, da mais próxima para a mais distante
+        np = self.np
+        logger.info(f"Histórico de crescimento: {len(self.nomes) - 1} clientes em {self.execucoes} execuções")
+        if self.execucoes < 2:
+            return
+        proximos = np.argsort(self.cruzamento)
+        for i in proximos[:limite]:
+            if np.isnat(self.cruzamento[i]):
+                break
+            if self.excedida[i]:
+                logger.warning(f"{self.nomes[i]} já ultrapassou a capacidade de {self.capacidades[i] / 1024 ** 3:.0f} GB")
+            elif self.cruzamento[i] <= self.datas_projecao[-1]:
+                logger.warning(
+                    f"{self.nomes[i]} deve atingir {self.capacidades[i] / 1024 ** 3:.0f} GB em "
+                    f"{str(self.cruzamento[i])[:10]} (ajuste {'exponencial' if self.exponencial[i] else 'linear'})"
+                )
+
+class SinkResultados(ABC):
+    # Destino das linhas da auditoria: o motor escreve conforme os clientes terminam e o
+    # relatório lê de volta em blocos, sem manter todas as linhas na memória
+    extensao = None
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho
+        self.total_linhas = 0
+
+    @abstractmethod
+    def escrever(self, linhas):
+        pass
+
+    def fechar(self):
+        pass
+
+    @abstractmethod
+    def ler_blocos(self, tamanho_bloco=5000):
+        pass
+
+class SinkMemoria(SinkResultados):
+    def __init__(self, linhas=None):
+        super().__init__()
+        self.linhas = linhas if linhas is not None else []
+        self.total_linhas = len(self.linhas)
+
+    def escrever(self, linhas):
+        self.linhas.extend(linhas)
+        self.total_linhas += len(linhas)
+
+    def ler_blocos(self, tamanho_bloco=5000):
+        import pandas as pd
+        for inicio in range(0, len(self.linhas), tamanho_bloco):
+            yield pd.DataFrame(self.linhas[inicio:inicio + tamanho_bloco])
+
+class SinkJSONL(SinkResultados):
+    extensao = 'jsonl'
+
+    def __init__(self, caminho):
+        super().__init__(caminho)
+        self.arquivo = open(caminho, 'w', encoding='utf-8')
+
+    def escrever(self, linhas):
+        self.arquivo.writelines(json.dumps(linha, ensure_ascii=False) + '\n' for linha in linhas)
+        self.total_linhas += len(linhas)
+
+    def fechar(self):
+        if not self.arquivo.closed:
+            self.arquivo.close()
+
+    def ler_blocos(self, tamanho_bloco=5000):
+        import pandas as pd
+        bloco = []
+        with open(self.caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                bloco.append(json.loads(linha))
+                if len(bloco) >= tamanho_bloco:
+                    yield pd.DataFrame(bloco)
+                    bloco = []
+        if bloco:
+            yield pd.DataFrame(bloco)
+
+class SinkCSV(SinkResultados):
+    extensao = 'csv'
+
+    def __init__(self, caminho):
+        super().__init__(caminho)
+        self.arquivo = open(caminho, 'w', encoding='utf-8', newline='')
+        self.escritor = None
+
+    def escrever(self, linhas):
+        if not linhas:
+            return
+        if self.escritor is None:
+            self.escritor = csv.DictWriter(self.arquivo, fieldnames=list(linhas[0]))
+            self.escritor.writeheader()
+        self.escritor.writerows(linhas)
+        self.total_linhas += len(linhas)
+
+    def fechar(self):
+        if not self.arquivo.closed:
+            self.arquivo.close()
+
+    def ler_blocos(self, tamanho_bloco=5000):
+        if not self.total_linhas:
+            return
+        import pandas as pd
+        textos = {'Cliente': str, 'Data Criação': str, 'Caminho': str}
+        yield from pd.read_csv(self.caminho, chunksize=tamanho_bloco, dtype=textos,
+                               keep_default_na=False, encoding='utf-8')
+
+class SinkParquet(SinkResultados):
+    extensao = 'parquet'
+    LINHAS_POR_GRUPO = 10000
+
+    def __init__(self, caminho):
+        super().__init__(caminho)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Saída Parquet requer o pacote pyarrow (pip install pyarrow)")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.escritor = None
+        self.pendentes = []
+
+    def escrever(self, linhas):
+        self.pendentes.extend(linhas)
+        self.total_linhas += len(linhas)
+        if len(self.pendentes) >= self.LINHAS_POR_GRUPO:
+            self._gravar_grupo()
+
+    def _gravar_grupo(self):
+        if not self.pendentes:
+            return
+        if self.escritor is None:
+            tabela = self.pa.Table.from_pylist(self.pendentes)
+            self.escritor = self.pq.ParquetWriter(self.caminho, tabela.schema)
+        else:
+            tabela = self.pa.Table.from_pylist(self.pendentes, schema=self.escritor.schema)
+        self.escritor.write_table(tabela)
+        self.pendentes = []
+
+    def fechar(self):
+        self._gravar_grupo()
+        if self.escritor is not None:
+            self.escritor.close()
+            self.escritor = None
+
+    def ler_blocos(self, tamanho_bloco=5000):
+        if not self.total_linhas:
+            return
+        for lote in self.pq.ParquetFile(self.caminho).iter_batches(batch_size=tamanho_bloco):
+            yield lote.to_pandas()
+
+SINKS_RESULTADOS = {
+    'memoria': SinkMemoria,
+    'jsonl': SinkJSONL,
+    'csv': SinkCSV,
+    'parquet': SinkParquet
+}
+
+class EscritorExcel:
+    # Escreve a aba 'Resumo' direto com o xlsxwriter, cada célula uma única vez: uma
+    # write_row por linha com o formato da linha (cliente ou subpasta) e formatação
+    # condicional na 'Data Criação' das linhas com 'Precisa Verificar' verdadeiro
+    # O caminho completo vai na coluna 'Caminho' como texto, como hyperlink ou, se pedido,
+    # também como comentário na coluna A (cada comentário gera VML e pesa na escrita e na abertura)
+    CAMINHOS = ('coluna', 'link', 'comentario')
+    LIMITE_LINKS = 65530
+    # Textos em fórmulas do Excel têm no máximo 255 caracteres
+    LIMITE_TEXTO_FORMULA = 255
+    # Largura por nome de coluna; colunas de tipo de arquivo e desconhecidas usam a padrão
+    LARGURAS = {'Cliente': 30, 'Data Criação': 15, 'Precisa Verificar': 12, 'Arquivos Esparsos': 12,
+                'Caminho': 60}
+    LARGURA_TAMANHO = 15
+    LARGURA_PADRAO = 10
+    BORDA = {'border': 1, 'border_color': '#B1B1B1'}
+    FORMATOS = {
+        'header': {
+            'bold': True,
+            'bg_color': '#C5E1F5',
+            **BORDA,
+            'align': 'center',
+            'valign': 'vcenter',
+            'text_wrap': True
+        },
+        'cliente': {
+            'bg_color': '#4B8BBE',
+            'font_color': '#FFFFFF',
+            **BORDA,
+            'align': 'left',
+            'valign': 'vcenter'
+        },
+        'subpasta': {
+            'bg_color': '#E5E5E5',
+            'indent': 1,
+            **BORDA,
+            'align': 'left',
+            'valign': 'vcenter'
+        },
+        # Formatação condicional não aceita alinhamento; o da linha é mantido
+        'verificar': {
+            'bg_color': '#FFB6B6',
+            'font_color': '#000000',
+            **BORDA
+        }
+    }
+
+    def __init__(self, caminho, tipos_arquivos, memoria_constante=False, caminhos='coluna'):
+        # Em constant_memory cada linha vai para o disco quando a seguinte começa; as
+        # linhas precisam ser escritas em ordem, o que escrever_bloco já garante
+        import xlsxwriter
+        self.caminho = caminho
+        self.tipos_arquivos = tipos_arquivos
+        self.workbook = xlsxwriter.Workbook(caminho, {
+            'nan_inf_to_errors': True,
+            'constant_memory': memoria_constante
+        })
+        self.worksheet = self.workbook.add_worksheet('Resumo')
+        self.formatos = {nome: self.workbook.add_format(config) for nome, config in self.FORMATOS.items()}
+        for nome in ('cliente', 'subpasta'):
+            self.formatos[f'{nome}_link'] = self.workbook.add_format({**self.FORMATOS[nome], 'underline': 1})
+        self.colunas = None
+        self.linhas = 0
+        self.links = 0
+        self.sem_link = 0
+        if caminhos == 'comentario' and memoria_constante:
+            # Comentários ficam na memória até o fechamento, o que anula o constant_memory
+            logger.warning("Comentários não são usados no Excel em fluxo; caminho mantido na coluna 'Caminho'")
+            caminhos = 'coluna'
+        self.caminhos = caminhos
+
+    def escrever_cabecalho(self, colunas):
+        self.colunas = list(colunas)
+        self.worksheet.write_row(0, 0, self.colunas, self.formatos['header'])
+        self.worksheet.set_row(0, 30)
+
+    def escrever_bloco(self, df):
+        if df.empty:
+            return
+        if self.colunas is None:
+            self.escrever_cabecalho(df.columns)
+        # Conversão por coluna: NaN vira célula vazia, categorias viram texto e os escalares
+        # do numpy viram tipos do Python que o xlsxwriter escreve sem inspecionar um a um
+        valores = df.astype(object).where(df.notna(), None).values.tolist()
+        subpastas = df['Cliente'].str.contains(' - ', regex=False).tolist()
+        caminhos = df['Caminho'].tolist()
+        coluna_caminho = self.colunas.index('Caminho')
+        worksheet = self.worksheet
+        formato_cliente, formato_subpasta = self.formatos['cliente'], self.formatos['subpasta']
+        link_cliente, link_subpasta = self.formatos['cliente_link'], self.formatos['subpasta_link']
+        opcoes_comentario = {'x_scale': 2, 'y_scale': 2, 'font_size': 9}
+        for linha, subpasta, caminho in zip(valores, subpastas, caminhos):
+            self.linhas += 1
+            worksheet.write_row(self.linhas, 0, linha, formato_subpasta if subpasta else formato_cliente)
+            if self.caminhos == 'link':
+                # Sobrescreve a célula 'Caminho' da mesma linha, o que o constant_memory permite
+                if not self.escrever_link(self.linhas, coluna_caminho, caminho,
+                                          link_subpasta if subpasta else link_cliente):
+                    self.sem_link += 1
+            elif self.caminhos == 'comentario':
+                # Comentário com o caminho completo
+                worksheet.write_comment(self.linhas, 0, caminho, opcoes_comentario)
+
+    def escrever_link(self, linha, coluna, caminho, formato):
+        # Raiz relativa (--root tree) também vira link absoluto; o texto da célula não muda
+        absoluto = os.path.abspath(caminho)
+        if os.name != 'nt' and os.path.isabs(absoluto):
+            # O xlsxwriter converte todo link file:// em caminho do Windows ('/' vira '\');
+            # a função HYPERLINK guarda a URI como está e não conta no limite de hyperlinks
+            uri = pathlib.Path(absoluto).as_uri()
+            if max(len(uri), len(caminho)) > self.LIMITE_TEXTO_FORMULA:
+                return False
+            nome = caminho.replace('"', '""')
+            self.worksheet.write_formula(linha, coluna, f'=HYPERLINK("{uri}","{nome}")', formato, caminho)
+            return True
+        if self.links >= self.LIMITE_LINKS:
+            return False
+        # 'external:' é o formato do xlsxwriter para caminhos locais e UNC
+        self.worksheet.write_url(linha, coluna, 'external:' + absoluto, formato, string=caminho)
+        self.links += 1
+        return True
+
+    def fechar(self):
+        if self.sem_link:
+            logger.warning(f"{self.sem_link} caminhos ficaram só como texto (Excel aceita {self.LIMITE_LINKS} "
+                           f"hyperlinks por aba e fórmulas HYPERLINK de até {self.LIMITE_TEXTO_FORMULA} caracteres)")
+        from xlsxwriter.utility import xl_col_to_name
+        try:
+            if self.linhas and 'Precisa Verificar' in self.colunas and 'Data Criação' in self.colunas:
+                coluna_data = self.colunas.index('Data Criação')
+                coluna_verificar = xl_col_to_name(self.colunas.index('Precisa Verificar'))
+                self.worksheet.conditional_format(1, coluna_data, self.linhas, coluna_data, {
+                    'type': 'formula',
+                    'criteria': f'=${coluna_verificar}2=TRUE',
+                    'format': self.formatos['verificar']
+                })
+
+            # Ajustar larguras das colunas
+            for indice, nome in enumerate(self.colunas or []):
+                largura = self.LARGURAS.get(
+                    nome, self.LARGURA_TAMANHO if nome.startswith('Tamanho') else self.LARGURA_PADRAO)
+                letra = xl_col_to_name(indice)
+                self.worksheet.set_column(f'{letra}:{letra}', largura)
+
+            # Congelar painel superior
+            self.worksheet.freeze_panes(1, 0)
+        finally:
+            self.workbook.close()
+
+class EscritorParquet:
+    # Exportação colunar tipada para pandas/DuckDB: flags de extensão e 'Precisa Verificar'
+    # booleanos, datas em datetime64, contagens e bytes em int64 e clientes como categoria
+    # (dictionary no Arrow); cada bloco vira um row group comprimido
+    COMPRESSAO = 'zstd'
+    INTEIROS = ('Tamanho Total (bytes)', 'Tamanho Único (bytes)', 'Tamanho Alocado (bytes)',
+                'Arquivos Esparsos')
+
+    def __init__(self, caminho, tipos_arquivos):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Exportação Parquet requer o pacote pyarrow (pip install pyarrow)")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.caminho = caminho
+        self.tipos_arquivos = tipos_arquivos
+        self.escritor = None
+        self.linhas = 0
+
+    def tipar(self, df):
+        import pandas as pd
+        colunas = {}
+        for tipo in self.tipos_arquivos:
+            if tipo in df:
+                colunas[tipo] = df[tipo].astype(str) == 'Sim'
+        if 'Precisa Verificar' in df:
+            colunas['Precisa Verificar'] = df['Precisa Verificar'].astype(bool)
+        if 'Data Criação' in df:
+            # 'Não disponível' vira NaT
+            colunas['Data Criação'] = pd.to_datetime(df['Data Criação'], format='%d/%m/%Y', errors='coerce')
+        for coluna in self.INTEIROS:
+            if coluna in df:
+                # Int64 aceita nulos: sem st_blocks o tamanho alocado fica vazio, não zero
+                colunas[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('Int64')
+        colunas['Cliente'] = df['Cliente'].astype('category')
+        return df.assign(**colunas)
+
+    def escrever_bloco(self, df):
+        if df.empty:
+            return
+        tabela = self.pa.Table.from_pandas(self.tipar(df), preserve_index=False)
+        if self.escritor is None:
+            # Índices int32 no dictionary dos clientes: o pandas usa int8 ou int16 conforme
+            # a quantidade de categorias do bloco, e o esquema precisa valer para todos
+            esquema = tabela.schema
+            esquema = esquema.set(esquema.get_field_index('Cliente'), self.pa.field(
+                'Cliente', self.pa.dictionary(self.pa.int32(), self.pa.string())))
+            self.escritor = self.pq.ParquetWriter(self.caminho, esquema, compression=self.COMPRESSAO)
+        self.escritor.write_table(tabela.cast(self.escritor.schema))
+        self.linhas += len(df)
+
+    def fechar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            self.escritor = None
+
+class EscalonadorRoubo:
+    # Pool limitado de trabalhadores, cada um com sua própria fila. O dono consome o fim
+    # da fila (LIFO, em profundidade) e quem fica sem trabalho rouba o início da fila dos
+    # outros, onde estão as pastas mais rasas e, em geral, as maiores subárvores.
+    def __init__(self, num_trabalhadores, executar_tarefa):
+        self.num_trabalhadores = max(1, int(num_trabalhadores))
+        self.executar_tarefa = executar_tarefa
+        self.filas = [deque() for _ in range(self.num_trabalhadores)]
+        self.condicao = threading.Condition()
+        self.pendentes = 0
+        self.roubos = 0
+        self.proxima_fila = 0
+        self.cancelado = False
+        self.local = threading.local()
+
+    def submeter(self, tarefa):
+        indice = getattr(self.local, 'indice', None)
+        with self.condicao:
+            if indice is None:
+                indice = self.proxima_fila
+                self.proxima_fila = (self.proxima_fila + 1) % self.num_trabalhadores
+            self.pendentes += 1
+            self.filas[indice].append(tarefa)
+            self.condicao.notify()
+
+    def obter_tarefa(self, indice):
+        try:
+            return self.filas[indice].pop()
+        except IndexError:
+            pass
+        for deslocamento in range(1, self.num_trabalhadores):
+            try:
+                tarefa = self.filas[(indice + deslocamento) % self.num_trabalhadores].popleft()
+                self.roubos += 1
+                return tarefa
+            except IndexError:
+                continue
+        return None
+
+    def cancelar(self):
+        with self.condicao:
+            self.cancelado = True
+            for fila in self.filas:
+                fila.clear()
+            self.condicao.notify_all()
+
+    def trabalhar(self, indice):
+        self.local.indice = indice
+        while not self.cancelado:
+            tarefa = self.obter_tarefa(indice)
+            if tarefa is None:
+                with self.condicao:
+                    if self.pendentes == 0:
+                        self.condicao.notify_all()
+                        return
+                    self.condicao.wait(timeout=0.05)
+                continue
+            try:
+                self.executar_tarefa(tarefa)
+            finally:
+                with self.condicao:
+                    self.pendentes -= 1
+                    if self.pendentes == 0:
+                        self.condicao.notify_all()
+
+    def executar(self, tarefas_iniciais):
+        for tarefa in tarefas_iniciais:
+            self.submeter(tarefa)
+        with ThreadPoolExecutor(max_workers=self.num_trabalhadores) as executor:
+            futuros = [executor.submit(self.trabalhar, i) for i in range(self.num_trabalhadores)]
+            try:
+                # Espera com timeout para que o Ctrl+C chegue à thread principal
+                em_andamento = set(futuros)
+                while em_andamento:
+                    _, em_andamento = wait(em_andamento, timeout=0.5)
+            except BaseException:
+                self.cancelar()
+                raise
+            for futuro in futuros:
+                futuro.result()
+
+class NoVarredura:
+    # Um diretório na árvore de varredura; o resultado é fechado quando todas as filhas terminam
+    __slots__ = ('caminho', 'nome', 'profundidade', 'pai', 'indice_cliente',
+                 'somar_no_pai', 'gera_linha', 'resultado', 'filhos', 'pendentes', 'inicio')
+
+    def __init__(self, caminho, nome, profundidade, pai=None, indice_cliente=0,
+                 somar_no_pai=True, gera_linha=False):
+        self.caminho = caminho
+        self.nome = nome
+        self.profundidade = profundidade
+        self.pai = pai
+        self.indice_cliente = indice_cliente
+        self.somar_no_pai = somar_no_pai
+        self.gera_linha = gera_linha
+        self.resultado = None
+        self.filhos = []
+        self.pendentes = 0
+        self.inicio = None
+
 class AuditoriaServidor:
-    def __init__(self):
-        self.tipos_arquivos = self.selecionar_tipos_arquivos()
-        self.pasta_raiz = self.selecionar_pasta_raiz()
-        self.local_saida = self.selecionar_local_saida()
+    def __init__(self, max_workers=None, motor='threads', concorrencia_listagem=64, retomar=False,
+                 saida_resultados='memoria', deduplicar_hardlinks=False,
+                 pasta_raiz=None, local_saida=None, tipos_arquivos=None, relatorio_em_fluxo=False,
+                 caminhos_excel='coluna', exportar_parquet=False, usar_banco=True, caminho_banco=None,
+                 usar_cache=True, idade_maxima_cache=None):
+        # Parâmetros informados dispensam o prompt e os diálogos (modo sem interface)
+        self.tipos_arquivos = (normalizar_tipos(tipos_arquivos) if tipos_arquivos
+                               else self.selecionar_tipos_arquivos())
+        self.pasta_raiz = pasta_raiz or self.selecionar_pasta_raiz()
+        self.local_saida = local_saida or self.selecionar_local_saida()
         self.dados_excel = []
-        self.max_workers = min(multiprocessing.cpu_count(), 4)
+        self.max_workers = max_workers or min(multiprocessing.cpu_count(), 4)
+        self.motor = motor
+        self.concorrencia_listagem = concorrencia_listagem
+        self.usar_cache = usar_cache
+        self.idade_maxima_cache = idade_maxima_cache
+        self.cache = None
+        self.retomar = retomar
+        self.journal = None
+        self.usar_banco = usar_banco
+        self.caminho_banco = caminho_banco
+        self.banco = None
+        self.relatorio_em_fluxo = relatorio_em_fluxo
+        self.caminhos_excel = caminhos_excel
+        self.exportar_parquet = exportar_parquet
+        if relatorio_em_fluxo and saida_resultados == 'memoria':
+            # Com o sink em memória todas as linhas continuariam carregadas até o relatório
+            logger.info("Relatório em fluxo: resultados gravados em JSONL em vez de mantidos na memória")
+            saida_resultados = 'jsonl'
+        self.saida_resultados = saida_resultados
+        self.sink = None
+        self.deduplicar_hardlinks = deduplicar_hardlinks
         self.tipos_set = set(self.tipos_arquivos)
         self.pastas_sistema = {'System Volume Information', '$RECYCLE.BIN', 'Recovery', 'Config.Msi'}
+        self.estatisticas = EstatisticasVarredura(self.pasta_raiz, motor, self.max_workers)
         self.instalar_dependencias()
     @staticmethod
-    def instalar_dependencias():
+    def instalar_dependencias(pacotes=None):
+        # find_spec só consulta os finders do sys.path; não importa o pacote nem chama o pip
         try:
-            required_packages = {"pandas", "xlsxwriter", "tqdm", "dash", "plotly"}
-            installed_packages = {
-                pkg.split('==')[0] 
-                for pkg in subprocess.check_output(
-                    [sys.executable, "-m", "pip", "freeze"],
-                    stderr=subprocess.DEVNULL
-                ).decode().split()
+            required_packages = pacotes or {"pandas", "xlsxwriter", "tqdm", "dash", "plotly"}
+            missing_packages = {
+                pkg for pkg in required_packages
+                if importlib.util.find_spec(pkg) is None
             }
-            missing_packages = required_packages - installed_packages
             
             if missing_packages:
                 logger.info(f"Instalando pacotes: {', '.join(missing_packages)}")
@@ -63,13 +1637,13 @@ class AuditoriaServidor:
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL
                 )
+                importlib.invalidate_caches()
         except Exception as e:
             logger.error(f"Erro na instalação de dependências: {str(e)}")
             sys.exit(1)
 
     def selecionar_tipos_arquivos(self):
-        tipos_padrao = ['.fls', '.lsproj', '.dwg', '.imp', '.rcp',
-                       '.dxf', '.rvt', '.pts', '.e57', '.las', '.nwd', '.ptx']
+        tipos_padrao = list(TIPOS_PADRAO)
         
         print("\nEscolha como definir os tipos de arquivos:")
         print("1. Usar tipos padrão")
@@ -103,6 +1677,8 @@ class AuditoriaServidor:
 
     @staticmethod
     def selecionar_pasta_raiz():
+        import tkinter as tk
+        from tkinter import filedialog
         root = tk.Tk()
         root.withdraw()
         pasta = filedialog.askdirectory(title="Selecione a pasta para auditoria")
@@ -113,6 +1689,8 @@ class AuditoriaServidor:
 
     @staticmethod
     def selecionar_local_saida():
+        import tkinter as tk
+        from tkinter import filedialog
         root = tk.Tk()
         root.withdraw()
         pasta = filedialog.askdirectory(title="Selecione o local para salvar o relatório")
@@ -120,75 +1698,137 @@ class AuditoriaServidor:
             logger.error("Nenhuma pasta selecionada para saída")
             sys.exit(1)
         return pasta
+
     @staticmethod
-    def obter_data_arquivo_log(pasta):
-        try:
-            for raiz, dirs, files in os.walk(pasta):
-                scan_dirs = [d for d in dirs if d.startswith('Scan_')]
-                for scan_dir in scan_dirs:
-                    log_file = os.path.join(raiz, scan_dir, 'log')
-                    if os.path.exists(log_file):
-                        with open(log_file, 'r', encoding='utf-8') as f:
-                            primeira_linha = f.readline().strip()
-                            try:
-                                data = datetime.strptime(primeira_linha.split()[0], '%d/%m/%Y')
-                                return data.strftime('%d/%m/%Y'), True
-                            except (ValueError, IndexError):
+    def ler_data_log_scan(raiz, dirs):
+        for scan_dir in (d for d in dirs if d.startswith('Scan_')):
+            log_file = os.path.join(raiz, scan_dir, 'log')
+            try:
+                with open(log_file, 'r', encoding='utf-8') as f:
+                    primeira_linha = f.readline().strip()
+                data = datetime.strptime(primeira_linha.split()[0], '%d/%m/%Y')
+                return data.strftime('%d/%m/%Y')
+            except (FileNotFoundError, ValueError, IndexError):
+                continue
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"Erro ao ler arquivo de log {log_file}: {str(e)}")
+                continue
+        return None
+
+    def novo_resultado(self, pasta):
+        return ResultadoPasta(
+            caminho=pasta,
+            arquivos_encontrados=dict.fromkeys(self.tipos_arquivos, False)
+        )
+
+    def varrer_nivel(self, pasta):
+        # Varre apenas os arquivos diretos da pasta e devolve as subpastas na ordem do os.walk.
+        # O tipo vem do d_type da listagem; cada arquivo custa no máximo um stat (DirEntry.stat
+        # guarda o resultado), e no Windows o próprio scandir já traz tamanho e datas.
+        # Os nomes são classificados depois da listagem para medir cada fase separadamente.
+        relogio = time.perf_counter
+        inicio = relogio()
+        resultado = self.novo_resultado(pasta)
+        resultado.pastas = 1
+        dirs, subpastas, nomes = [], [], []
+        workspace = None
+        try:
+            entries = os.scandir(pasta)
+        except OSError as e:
+            logger.warning(f"Erro ao acessar diretório {pasta}: {str(e)}")
+            resultado.erros += 1
+            resultado.tempo_listagem = relogio() - inicio
+            return resultado, subpastas
+
+        deduplicar = self.deduplicar_hardlinks
+        tempo_stat = 0.0
+        with entries:
+            try:
+                for entry in entries:
+                    nome = entry.name
+                    if nome == 'WorkspaceData':
+                        workspace = entry
+                    antes_stat = relogio()
+                    try:
+                        if entry.is_symlink():
+                            # Links são resolvidos como no os.walk: pasta listada, arquivo somado
+                            resultado.chamadas_stat += 1
+                            info = entry.stat()
+                            if stat.S_ISDIR(info.st_mode):
+                                dirs.append(nome)
+                                subpastas.append((nome, entry.path, True))
                                 continue
-        except Exception as e:
-            logger.error(f"Erro ao ler arquivo de log: {str(e)}")
-        return None, False
-
-    def verificar_arquivos_otimizado(self, pasta):
-        arquivos_encontrados = dict.fromkeys(self.tipos_arquivos, False)
-        try:
-            for raiz, _, files in os.walk(pasta):
-                for file in (f for f in files if os.path.splitext(f.lower())[1] in self.tipos_set):
-                    ext = os.path.splitext(file.lower())[1]
-                    arquivos_encontrados[ext] = True
-                    if all(arquivos_encontrados.values()):
-                        return arquivos_encontrados
-        except PermissionError:
-            logger.warning(f"Acesso negado à pasta: {pasta}")
-        except Exception as e:
-            logger.error(f"Erro ao verificar arquivos em {pasta}: {str(e)}")
-        return arquivos_encontrados
-
-    @lru_cache(maxsize=1000)
-    def calcular_tamanho_pasta(self, pasta):
-        try:
-            total = 0
-            for root, _, files in os.walk(pasta):
-                try:
-                    for file in files:
-                        try:
-                            file_path = os.path.join(root, file)
-                            if os.path.exists(file_path):
-                                total += os.path.getsize(file_path)
-                        except (OSError, PermissionError) as e:
-                            logger.warning(f"Erro ao acessar arquivo {file_path}: {str(e)}")
+                        elif entry.is_dir(follow_symlinks=False):
+                            dirs.append(nome)
+                            subpastas.append((nome, entry.path, False))
                             continue
-                except (OSError, PermissionError) as e:
-                    logger.warning(f"Erro ao acessar diretório {root}: {str(e)}")
-                    continue
-                    
-            return round(total / (1024 ** 3), 2)  # Conversão para GB
-        except Exception as e:
-            logger.error(f"Erro ao calcular tamanho da pasta {pasta}: {str(e)}")
-            return 0
+                        elif deduplicar and STAT_GRATUITO:
+                            # No Windows o DirEntry não traz st_nlink/st_ino; só o os.stat completo
+                            resultado.chamadas_stat += 1
+                            info = os.stat(entry.path, follow_symlinks=False)
+                        else:
+                            if not STAT_GRATUITO:
+                                resultado.chamadas_stat += 1
+                            info = entry.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        # Link quebrado: conta a extensão, mas não o tamanho
+                        info = None
+                    except OSError as e:
+                        logger.warning(f"Erro ao acessar arquivo {entry.path}: {str(e)}")
+                        resultado.erros += 1
+                        info = None
+                    tempo_stat += relogio() - antes_stat
+
+                    nomes.append(nome)
+                    if info is not None:
+                        resultado.tamanho_bytes += info.st_size
+                        if ALOCACAO_DISPONIVEL:
+                            alocado = info.st_blocks * 512
+                            resultado.bytes_alocados += alocado
+                            if info.st_size - alocado >= FOLGA_ESPARSO:
+                                resultado.arquivos_esparsos += 1
+                        if deduplicar and info.st_nlink > 1:
+                            resultado.registrar_link((info.st_dev << 64) | info.st_ino, info.st_size, info.st_nlink)
+            except OSError as e:
+                # Falha no meio da listagem (ex.: EIO em compartilhamento SMB): o que já foi
+                # lido é mantido e a pasta conta como erro, o que também a tira do cache
+                logger.warning(f"Erro ao listar diretório {pasta}: {str(e)}")
+                resultado.erros += 1
+        fim_listagem = relogio()
+        resultado.tempo_listagem = fim_listagem - inicio - tempo_stat
 
-    def obter_data_criacao(self, pasta):
-        data_log, encontrado_log = self.obter_data_arquivo_log(pasta)
-        if encontrado_log:
-            return data_log, False
+        arquivos_encontrados = resultado.arquivos_encontrados
+        tipos_set = self.tipos_set
+        for ext in map(extensao_arquivo, nomes):
+            if ext in tipos_set:
+                arquivos_encontrados[ext] = True
+        resultado.arquivos = len(nomes)
+        inicio_logs = relogio()
+        resultado.tempo_classificacao = inicio_logs - fim_listagem
 
-        workspace_path = os.path.join(pasta, 'WorkspaceData')
-        if os.path.exists(workspace_path):
+        if workspace is not None:
             try:
-                data = datetime.fromtimestamp(os.path.getctime(workspace_path))
-                return data.strftime('%d/%m/%Y'), False
+                resultado.chamadas_stat_pastas += 1
+                resultado.ctime_workspace = workspace.stat().st_ctime
+            except FileNotFoundError:
+                pass
             except (OSError, PermissionError) as e:
                 logger.warning(f"Erro ao acessar WorkspaceData: {str(e)}")
+            fim_workspace = relogio()
+            tempo_stat += fim_workspace - inicio_logs
+            inicio_logs = fim_workspace
+        resultado.tempo_stat = tempo_stat
+
+        resultado.data_log = self.ler_data_log_scan(pasta, dirs)
+        resultado.tempo_logs = relogio() - inicio_logs
+        return resultado, subpastas
+
+    def obter_data_criacao(self, pasta, resultado):
+        if resultado.data_log is not None:
+            return resultado.data_log, False
+
+        if resultado.ctime_workspace is not None:
+            return datetime.fromtimestamp(resultado.ctime_workspace).strftime('%d/%m/%Y'), False
 
         try:
             data = datetime.fromtimestamp(os.path.getctime(pasta))
@@ -196,191 +1836,564 @@ class AuditoriaServidor:
         except (OSError, PermissionError) as e:
             logger.warning(f"Erro ao obter data de criação de {pasta}: {str(e)}")
             return "Não disponível", True
-    def processar_pasta_paralelo(self, args):
-        caminho, nome, is_subpasta = args
+
+    def montar_linha(self, resultado, nome, is_subpasta):
+        caminho = resultado.caminho
+        data_criacao, precisa_verificar = self.obter_data_criacao(caminho, resultado)
+
+        # Formata o nome da pasta para exibição
+        nome_exibicao = nome
+        if is_subpasta:
+            pasta_pai = os.path.basename(os.path.dirname(caminho))
+            nome_exibicao = f"{pasta_pai} - {nome}"
+
+        return {
+            'Cliente': nome_exibicao,
+            'Data Criação': data_criacao,
+            'Precisa Verificar': precisa_verificar,
+            'Tamanho Total (GB)': resultado.tamanho_gb,
+            'Tamanho Total (bytes)': resultado.tamanho_bytes,
+            **({'Tamanho Único (GB)': round(resultado.bytes_unicos / (1024 ** 3), 2),
+                'Tamanho Único (bytes)': resultado.bytes_unicos}
+               if self.deduplicar_hardlinks else {}),
+            'Tamanho Alocado (GB)': (round(resultado.bytes_alocados / (1024 ** 3), 2)
+                                     if ALOCACAO_DISPONIVEL else None),
+            'Tamanho Alocado (bytes)': resultado.bytes_alocados if ALOCACAO_DISPONIVEL else None,
+            'Arquivos Esparsos': resultado.arquivos_esparsos,
+            **{tipo: 'Sim' if encontrado else 'Não'
+               for tipo, encontrado in resultado.arquivos_encontrados.items()},
+            'Caminho': caminho
+        }
+
+    def varrer_nivel_com_cache(self, pasta):
+        if self.cache is None:
+            return self.varrer_nivel(pasta)
+        inicio = time.perf_counter()
         try:
-            tamanho = self.calcular_tamanho_pasta(caminho)
-            arquivos = self.verificar_arquivos_otimizado(caminho)
-            data_criacao, precisa_verificar = self.obter_data_criacao(caminho)
-            
-            # Formata o nome da pasta para exibição
-            nome_exibicao = nome
-            if is_subpasta:
-                pasta_pai = os.path.basename(os.path.dirname(caminho))
-                nome_exibicao = f"{pasta_pai} - {nome}"
-            
-            return {
-                'Cliente': nome_exibicao,
-                'Data Criação': data_criacao,
-                'Precisa Verificar': precisa_verificar,
-                'Tamanho Total (GB)': tamanho,
-                **{tipo: 'Sim' if encontrado else 'Não'
-                   for tipo, encontrado in arquivos.items()},
-                'Caminho': caminho
-            }
+            stat_dir = os.stat(pasta)
+        except OSError:
+            return self.varrer_nivel(pasta)
+        tempo_stat = time.perf_counter() - inicio
+
+        em_cache = self.cache.buscar(pasta, stat_dir)
+        if em_cache is not None:
+            em_cache[0].chamadas_stat_pastas += 1
+            em_cache[0].pastas = 1
+            em_cache[0].tempo_stat = tempo_stat
+            return em_cache
+        resultado, subpastas = self.varrer_nivel(pasta)
+        resultado.chamadas_stat_pastas += 1
+        resultado.tempo_stat += tempo_stat
+        if not resultado.erros:
+            self.cache.guardar(pasta, stat_dir, resultado, subpastas)
+        return resultado, subpastas
+
+    def processar_no(self, no):
+        for filho in self.expandir_no(no, self.listar_no(no)):
+            self._escalonador.submeter(filho)
+
+    def listar_no(self, no):
+        if no.profundidade == 0:
+            no.inicio = time.perf_counter()
+        try:
+            no.resultado, subpastas = self.varrer_nivel_com_cache(no.caminho)
         except Exception as e:
-            logger.error(f"Erro ao processar {caminho}: {str(e)}")
+            logger.error(f"Erro ao varrer {no.caminho}: {str(e)}")
+            no.resultado, subpastas = self.novo_resultado(no.caminho), []
+            no.resultado.erros = 1
+
+        with self._trava_arvore:
+            self.arquivos_varridos += no.resultado.arquivos
+            self.chamadas_stat += no.resultado.chamadas_stat
+            self.chamadas_stat_pastas += no.resultado.chamadas_stat_pastas
+        self.estatisticas.registrar_pasta(no.resultado)
+        return subpastas
+
+    def expandir_no(self, no, subpastas):
+        for nome, caminho, is_symlink in subpastas:
+            if no.profundidade == 0:
+                # Subpastas diretas do cliente geram linha própria; links simbólicos são
+                # varridos para a linha, mas não entram no total (o os.walk não os segue)
+                gera_linha = nome not in self.pastas_sistema
+                if is_symlink and not gera_linha:
+                    continue
+                no.filhos.append(NoVarredura(
+                    caminho, nome, 1, no, no.indice_cliente,
+                    somar_no_pai=not is_symlink, gera_linha=gera_linha
+                ))
+            elif not is_symlink:
+                no.filhos.append(NoVarredura(caminho, nome, no.profundidade + 1, no, no.indice_cliente))
+
+        filhos = list(no.filhos)
+        with self._trava_arvore:
+            no.pendentes = len(filhos)
+        if not filhos:
+            self.finalizar_no(no)
+        return filhos
+
+    async def varrer_no_async(self, no, executor, semaforo):
+        loop = asyncio.get_running_loop()
+        async with semaforo:
+            subpastas = await loop.run_in_executor(executor, self.listar_no, no)
+        filhos = self.expandir_no(no, subpastas)
+        if filhos:
+            await asyncio.gather(*(self.varrer_no_async(filho, executor, semaforo) for filho in filhos))
+
+    async def executar_motor_asyncio(self, raizes):
+        # Para compartilhamentos SMB/NFS com alta latência: centenas de listagens em voo ao
+        # mesmo tempo, limitadas pelo semáforo; o scandir roda no pool de threads
+        semaforo = asyncio.Semaphore(self.concorrencia_listagem)
+        with ThreadPoolExecutor(max_workers=self.concorrencia_listagem) as executor:
+            await asyncio.gather(*(self.varrer_no_async(no, executor, semaforo) for no in raizes))
+
+    def finalizar_no(self, no):
+        while no is not None:
+            for filho in no.filhos:
+                if filho.somar_no_pai:
+                    no.resultado.combinar(filho.resultado)
+
+            if no.profundidade == 0:
+                self.concluir_cliente(no)
+                return
+            if no.profundidade > 1:
+                no.filhos = None
+
+            pai = no.pai
+            with self._trava_arvore:
+                pai.pendentes -= 1
+                pronto = pai.pendentes == 0
+            no = pai if pronto else None
+
+    def concluir_cliente(self, no):
+        self.estatisticas.registrar_cliente(no.nome, no.caminho, time.perf_counter() - no.inicio, no.resultado)
+        linhas = [self.montar_linha(no.resultado, no.nome, False)]
+        linhas.extend(
+            self.montar_linha(filho.resultado, filho.nome, True)
+            for filho in no.filhos if filho.gera_linha
+        )
+        no.filhos = None
+        self.emitir_cliente(no.indice_cliente, linhas)
+
+    def emitir_cliente(self, indice_cliente, linhas, registrar=True):
+        if registrar and linhas and self.journal is not None:
+            self.journal.registrar(linhas[0]['Caminho'], linhas)
+        if self.banco is not None:
+            self.banco.registrar(linhas)
+
+        # Mantém a ordem original dos clientes mesmo que terminem fora de ordem
+        with self._trava_arvore:
+            self._clientes_concluidos[indice_cliente] = linhas
+            while self._proximo_cliente in self._clientes_concluidos:
+                self.sink.escrever(self._clientes_concluidos.pop(self._proximo_cliente))
+                self._proximo_cliente += 1
+            if self._progresso is not None:
+                self._progresso.concluir_cliente()
+
+    def preparar_varredura(self, progresso=None):
+        self._trava_arvore = threading.Lock()
+        self._clientes_concluidos = {}
+        self._proximo_cliente = 0
+        self._progresso = progresso
+        self.arquivos_varridos = 0
+        self.chamadas_stat = self.chamadas_stat_pastas = 0
+        self.estatisticas = EstatisticasVarredura(self.pasta_raiz, self.motor, self.max_workers, progresso)
+
+    def configuracao_varredura(self):
+        return {
+            'tipos_arquivos': list(self.tipos_arquivos),
+            'pastas_sistema': set(self.pastas_sistema),
+            'pasta_raiz': self.pasta_raiz,
+            'local_saida': self.local_saida,
+            'usar_cache': self.usar_cache,
+            'idade_maxima_cache': self.idade_maxima_cache,
+            'execucao': self.execucao,
+            'deduplicar_hardlinks': self.deduplicar_hardlinks
+        }
+
+    @classmethod
+    def de_configuracao(cls, config):
+        # Instância sem diálogos, usada pelos processos trabalhadores
+        auditoria = cls.__new__(cls)
+        auditoria.tipos_arquivos = config['tipos_arquivos']
+        auditoria.tipos_set = set(auditoria.tipos_arquivos)
+        auditoria.pastas_sistema = config['pastas_sistema']
+        auditoria.pasta_raiz = config['pasta_raiz']
+        auditoria.local_saida = config['local_saida']
+        auditoria.usar_cache = config['usar_cache']
+        auditoria.idade_maxima_cache = config['idade_maxima_cache']
+        auditoria.execucao = config['execucao']
+        auditoria.deduplicar_hardlinks = config['deduplicar_hardlinks']
+        auditoria.cache = None
+        auditoria.journal = None
+        auditoria.banco = None
+        auditoria.dados_excel = []
+        auditoria.max_workers = 1
+        auditoria.motor = 'threads'
+        auditoria.estatisticas = EstatisticasVarredura(auditoria.pasta_raiz, auditoria.motor)
+        return auditoria
+
+    def varrer_cliente(self, caminho, nome):
+        self.preparar_varredura()
+        self.dados_excel = []
+        self.sink = SinkMemoria(self.dados_excel)
+        self.cache = self.abrir_cache()
+        try:
+            self._escalonador = EscalonadorRoubo(self.max_workers, self.processar_no)
+            self._escalonador.executar([NoVarredura(caminho, nome, 0)])
+        finally:
+            if self.cache is not None:
+                self.estatisticas.registrar_cache(self.cache.acertos, self.cache.falhas)
+                self.cache.fechar()
+                self.cache = None
+        return self.dados_excel
+
+    def executar_motor_processos(self, pendentes):
+        # Um cliente por tarefa; o resultado volta compacto (colunas uma vez e tuplas de valores)
+        config = self.configuracao_varredura()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futuros = {
+                executor.submit(varrer_cliente_processo, config, entry.path, entry.name): (i, entry)
+                for i, entry in pendentes
+            }
+            try:
+                for futuro in as_completed(futuros):
+                    indice, entry = futuros[futuro]
+                    try:
+                        (colunas, valores, arquivos, chamadas_stat, chamadas_stat_pastas,
+                         estatisticas) = futuro.result()
+                        self.estatisticas.mesclar(estatisticas)
+                    except Exception as e:
+                        logger.error(f"Erro ao processar {entry.path}: {str(e)}")
+                        colunas, valores, arquivos, chamadas_stat, chamadas_stat_pastas = (), [], 0, 0, 0
+                    with self._trava_arvore:
+                        self.arquivos_varridos += arquivos
+                        self.chamadas_stat += chamadas_stat
+                        self.chamadas_stat_pastas += chamadas_stat_pastas
+                    self.emitir_cliente(indice, [dict(zip(colunas, linha)) for linha in valores])
+            except BaseException:
+                for futuro in futuros:
+                    futuro.cancel()
+                raise
+
+    def executar_varredura_paralela(self, pendentes, retomados=()):
+        self.cache = self.abrir_cache()
+        raizes = [
+            NoVarredura(entry.path, entry.name, 0, indice_cliente=i)
+            for i, entry in pendentes
+        ]
+        concluido = False
+        try:
+            if self.motor == 'asyncio':
+                asyncio.run(self.executar_motor_asyncio(raizes))
+                logger.info(f"Varredura asyncio com até {self.concorrencia_listagem} listagens simultâneas")
+            elif self.motor == 'processos':
+                self.executar_motor_processos(pendentes)
+                logger.info(f"Varredura em {self.max_workers} processos, um cliente por tarefa")
+            else:
+                self._escalonador = EscalonadorRoubo(self.max_workers, self.processar_no)
+                self._escalonador.executar(raizes)
+                logger.info(
+                    f"Varredura paralela com {self._escalonador.num_trabalhadores} trabalhadores "
+                    f"({self._escalonador.roubos} tarefas roubadas)"
+                )
+            concluido = True
+        finally:
+            if self.cache is not None and self.cache.acertos + self.cache.falhas:
+                logger.info(
+                    f"Cache de varredura: {self.cache.acertos} pastas reaproveitadas, "
+                    f"{self.cache.falhas} varridas"
+                )
+            if self.cache is not None:
+                self.estatisticas.registrar_cache(self.cache.acertos, self.cache.falhas)
+                self.cache.fechar(self.pasta_raiz if concluido else None, retomados)
+                self.cache = None
+        logger.info(
+            f"Chamadas de stat: {self.chamadas_stat} para {self.arquivos_varridos} arquivos "
+            f"({self.chamadas_stat / max(self.arquivos_varridos, 1):.2f} por arquivo) e "
+            f"{self.chamadas_stat_pastas} para {self.estatisticas.pastas} pastas "
+            f"(validação do cache e WorkspaceData)"
+        )
+
+    def abrir_cache(self):
+        if not self.usar_cache:
+            return None
+        caminho_banco = os.path.join(self.local_saida, '.auditoria_cache.sqlite')
+        try:
+            return CacheVarredura(caminho_banco, self.tipos_arquivos, self.execucao, self.deduplicar_hardlinks,
+                                  self.idade_maxima_cache)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache de varredura indisponível ({caminho_banco}): {str(e)}")
+            return None
+
+    def abrir_banco(self):
+        if not self.usar_banco:
             return None
+        caminho_banco = self.caminho_banco or os.path.join(self.local_saida, 'auditorias.sqlite')
+        try:
+            banco = BancoResultados(caminho_banco, self.tipos_arquivos)
+            banco.abrir(self.execucao, self.pasta_raiz, self.motor)
+            logger.info(f"Resultados registrados no banco {caminho_banco} (execução {banco.execucao_id})")
+            return banco
+        except sqlite3.Error as e:
+            logger.warning(f"Banco de resultados indisponível ({caminho_banco}): {str(e)}")
+            return None
+
+    def abrir_journal(self):
+        nome_raiz = os.path.basename(os.path.normpath(self.pasta_raiz))
+        chave = hashlib.sha1(os.path.abspath(self.pasta_raiz).encode('utf-8')).hexdigest()[:8]
+        self.journal = JournalAuditoria(
+            os.path.join(self.local_saida, f'.auditoria_journal_{nome_raiz}_{chave}.jsonl'),
+            self.pasta_raiz, self.tipos_arquivos, self.deduplicar_hardlinks
+        )
+        concluidos = self.journal.carregar() if self.retomar else {}
+        self.journal.abrir(concluidos)
+        return concluidos
+
+    def abrir_sink(self):
+        classe = SINKS_RESULTADOS[self.saida_resultados]
+        if classe is SinkMemoria:
+            return SinkMemoria(self.dados_excel)
+        caminho = self.caminho_saida(classe.extensao)
+        logger.info(f"Resultados gravados em fluxo em: {caminho}")
+        return classe(caminho)
+
+    def nova_execucao(self):
+        # Duas auditorias da mesma raiz no mesmo segundo ganham sufixo em vez de sobrescrever
+        # os arquivos uma da outra
+        base = datetime.now().strftime('%Y%m%d_%H%M%S')
+        nome_raiz = os.path.basename(os.path.normpath(self.pasta_raiz))
+        execucao, sufixo = base, 1
+        while glob.glob(os.path.join(glob.escape(self.local_saida),
+                                     f"Auditoria_{glob.escape(nome_raiz)}_{execucao}.*")):
+            sufixo += 1
+            execucao = f"{base}_{sufixo}"
+        return execucao
+
+    def caminho_saida(self, extensao):
+        # Sink, relatório, Parquet tipado e scan_stats.json da execução compartilham o nome
+        nome_raiz = os.path.basename(os.path.normpath(self.pasta_raiz))
+        return os.path.join(self.local_saida, f"Auditoria_{nome_raiz}_{self.execucao}.{extensao}")
+
+    def ler_blocos_resultados(self, tamanho_bloco=5000):
+        # Lê o sink em blocos; colunas Sim/Não viram categorias para ocupar pouca memória
+        import pandas as pd
+        sink = self.sink if self.sink is not None else SinkMemoria(self.dados_excel)
+        for bloco in sink.ler_blocos(tamanho_bloco):
+            for coluna in self.tipos_arquivos:
+                if coluna in bloco:
+                    bloco[coluna] = pd.Categorical(bloco[coluna], categories=['Sim', 'Não'])
+            yield bloco
+
+    def carregar_resultados(self, tamanho_bloco=5000):
+        import pandas as pd
+        blocos = list(self.ler_blocos_resultados(tamanho_bloco))
+        if not blocos:
+            return pd.DataFrame()
+        return pd.concat(blocos, ignore_index=True)
+
+    def estatisticas_anteriores(self):
+        # scan_stats.json mais recente desta raiz em local_saida (ver gerar_relatorio); o padrão
+        # também casa com raízes de mesmo prefixo (Clientes e Clientes_2019), filtradas pela raiz gravada
+        raiz = os.path.normpath(os.path.abspath(self.pasta_raiz))
+        padrao = os.path.join(glob.escape(self.local_saida),
+                              f"Auditoria_{glob.escape(os.path.basename(raiz))}_*.scan_stats.json")
+        for caminho in sorted(glob.glob(padrao), reverse=True):
+            try:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+                if not dados.get('pasta_raiz') or os.path.normpath(os.path.abspath(dados['pasta_raiz'])) != raiz:
+                    continue
+                if dados.get('duracao_segundos') and dados.get('clientes'):
+                    return dados
+            except (OSError, ValueError) as e:
+                logger.warning(f"Estatísticas anteriores ilegíveis em {caminho}: {str(e)}")
+        return None
+
+    def criar_progresso(self, pastas_principais, pendentes):
+        anteriores = self.estatisticas_anteriores()
+        if anteriores is None:
+            return ProgressoVarredura(len(pastas_principais))
+
+        por_cliente = {c['cliente']: c for c in anteriores['clientes'] if 'pastas' in c}
+        if not por_cliente:
+            return ProgressoVarredura(len(pastas_principais))
+        # Clientes novos entram com a mediana dos conhecidos
+        mediana_pastas = sorted(c['pastas'] for c in por_cliente.values())[len(por_cliente) // 2]
+        mediana_bytes = sorted(c['bytes'] for c in por_cliente.values())[len(por_cliente) // 2]
+        pastas_previstas = bytes_previstos = 0
+        for _, entry in pendentes:
+            cliente = por_cliente.get(entry.name)
+            pastas_previstas += cliente['pastas'] if cliente else mediana_pastas
+            bytes_previstos += cliente['bytes'] if cliente else mediana_bytes
+        taxa_anterior = anteriores['pastas'] / anteriores['duracao_segundos']
+        logger.info(
+            f"Progresso estimado pela execução de {anteriores['inicio']}: {pastas_previstas} pastas, "
+            f"{bytes_previstos / 1024 ** 3:.1f} GB, {taxa_anterior:.0f} pastas/s"
+        )
+        return ProgressoVarredura(len(pastas_principais), pastas_previstas, bytes_previstos, taxa_anterior)
 
     def executar_auditoria(self):
         logger.info("Iniciando processo de auditoria...")
         self.dados_excel = []
+        self.execucao = self.nova_execucao()
         
         # Processa pastas principais
         pastas_principais = [
             entry for entry in os.scandir(self.pasta_raiz)
             if entry.is_dir() and entry.name not in self.pastas_sistema
         ]
+        concluidos = self.abrir_journal()
+        self.sink = self.abrir_sink()
+        self.banco = self.abrir_banco()
         
-        with tqdm(total=len(pastas_principais), desc="Processando pastas") as pbar:
-            for entry in pastas_principais:
-                try:
-                    # Processa pasta principal
-                    resultado_principal = self.processar_pasta_paralelo(
-                        (entry.path, entry.name, False)
+        pendentes = [
+            (indice, entry) for indice, entry in enumerate(pastas_principais)
+            if entry.path not in concluidos
+        ]
+        
+        status = 'interrompida'
+        try:
+            with self.criar_progresso(pastas_principais, pendentes) as progresso:
+                self.preparar_varredura(progresso)
+                for indice, entry in enumerate(pastas_principais):
+                    if entry.path in concluidos:
+                        self.emitir_cliente(indice, concluidos[entry.path], registrar=False)
+                if self.retomar:
+                    logger.info(
+                        f"Retomando auditoria: {len(pastas_principais) - len(pendentes)} clientes "
+                        f"recuperados do journal, {len(pendentes)} a varrer"
                     )
-                    if resultado_principal:
-                        self.dados_excel.append(resultado_principal)
-                        
-                        # Processa apenas subpastas diretas
-                        subpastas = [
-                            subentry for subentry in os.scandir(entry.path)
-                            if subentry.is_dir() and subentry.name not in self.pastas_sistema
-                        ]
-                        
-                        for subentry in subpastas:
-                            resultado_sub = self.processar_pasta_paralelo(
-                                (subentry.path, subentry.name, True)
-                            )
-                            if resultado_sub:
-                                self.dados_excel.append(resultado_sub)
-                    
-                    pbar.update(1)
-                except Exception as e:
-                    logger.error(f"Erro ao processar {entry.path}: {str(e)}")
-                    pbar.update(1)
-                    continue
 
-        logger.info(f"Auditoria concluída. Total de itens processados: {len(self.dados_excel)}")
+                self.executar_varredura_paralela(pendentes, list(concluidos))
+            status = 'concluida'
+        except KeyboardInterrupt:
+            logger.warning(f"Auditoria interrompida; use --resume para continuar de {self.journal.caminho}")
+            raise
+        finally:
+            self.journal.fechar()
+            self.sink.fechar()
+            if self.banco is not None:
+                self.banco.fechar(status)
+
+        self.estatisticas.concluir()
+        resumo = self.estatisticas.para_dict()
+        logger.info(
+            f"Varredura: {resumo['pastas']} pastas e {resumo['arquivos']} arquivos em "
+            f"{resumo['duracao_segundos']:.1f}s ({resumo['arquivos_por_segundo'] or 0:.0f} arquivos/s, "
+            f"{(resumo['bytes_por_segundo'] or 0) / 1024 ** 2:.1f} MB/s, {resumo['erros']} erros)"
+        )
+        logger.info(f"Auditoria concluída. Total de itens processados: {self.sink.total_linhas}")
     def gerar_relatorio(self):
         logger.info("Iniciando geração do relatório Excel...")
         try:
-            if not self.dados_excel:
-                logger.error("Nenhum dado para gerar relatório")
-                raise ValueError("Não há dados para gerar o relatório")
+            caminho_arquivo = self.caminho_saida('xlsx')
+
+            if self.relatorio_em_fluxo:
+                # Sem DataFrame completo: quem precisar dele (o dashboard) carrega depois
+                df = None
+                self.escrever_excel_em_fluxo(caminho_arquivo)
+            else:
+                inicio = time.perf_counter()
+                df = self.carregar_resultados()
+                self.estatisticas.registrar_fase('dataframe', time.perf_counter() - inicio, len(df))
+                if df.empty:
+                    logger.error("Nenhum dado para gerar relatório")
+                    raise ValueError("Não há dados para gerar o relatório")
 
-            df = pd.DataFrame(self.dados_excel)
-            nome_arquivo = f"Auditoria_{os.path.basename(self.pasta_raiz)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            caminho_arquivo = os.path.join(self.local_saida, nome_arquivo)
+                inicio = time.perf_counter()
+                self.escrever_excel(caminho_arquivo, df)
+                self.estatisticas.registrar_fase('excel', time.perf_counter() - inicio, len(df))
 
-            with pd.ExcelWriter(caminho_arquivo, engine='xlsxwriter') as writer:
-                df.to_excel(writer, sheet_name='Resumo', index=False)
-                self.formatar_excel(writer, df)
+            if self.exportar_parquet:
+                # Sufixo próprio para não colidir com a saída --saida-resultados parquet
+                caminho_parquet = self.caminho_saida('tipado.parquet')
+                self.escrever_parquet(caminho_parquet, df)
+                logger.info(f"Resultados tipados em: {caminho_parquet}")
             
             logger.info(f"Relatório gerado com sucesso em: {caminho_arquivo}")
+            self.estatisticas.salvar(self.caminho_saida('scan_stats.json'))
+            logger.info(f"Estatísticas da varredura em: {self.estatisticas.caminho}")
+            if self.journal is not None:
+                self.journal.descartar()
             return df
         except Exception as e:
             logger.error(f"Erro ao gerar relatório: {str(e)}")
             raise
 
-    def formatar_excel(self, writer, df):
+    def escrever_excel(self, caminho_arquivo, df):
         try:
-            workbook = writer.book
-            worksheet = writer.sheets['Resumo']
-
-            formatos = {
-                'header': {
-                    'bold': True, 
-                    'bg_color': '#C5E1F5', 
-                    'border': 1,
-                    'border_color': '#B1B1B1',
-                    'align': 'center',
-                    'valign': 'vcenter',
-                    'text_wrap': True
-                },
-                'cliente': {
-                    'bg_color': '#4B8BBE', 
-                    'font_color': '#FFFFFF',
-                    'border': 1,
-                    'border_color': '#B1B1B1',
-                    'align': 'left',
-                    'valign': 'vcenter'
-                },
-                'subpasta': {
-                    'bg_color': '#E5E5E5', 
-                    'indent': 1,
-                    'border': 1,
-                    'border_color': '#B1B1B1',
-                    'align': 'left',
-                    'valign': 'vcenter'
-                },
-                'verificar': {
-                    'bg_color': '#FFB6B6',
-                    'border': 1,
-                    'border_color': '#B1B1B1',
-                    'align': 'left',
-                    'valign': 'vcenter'
-                }
-            }
-
-            # Criar formatos
-            excel_formatos = {
-                nome: workbook.add_format(config)
-                for nome, config in formatos.items()
-            }
+            escritor = EscritorExcel(caminho_arquivo, self.tipos_arquivos, caminhos=self.caminhos_excel)
+            try:
+                escritor.escrever_cabecalho(df.columns)
+                escritor.escrever_bloco(df)
+            finally:
+                escritor.fechar()
+        except Exception as e:
+            logger.error(f"Erro ao formatar Excel: {str(e)}")
+            raise
 
-            # Configurar cabeçalho
-            for col_num, value in enumerate(df.columns.values):
-                worksheet.write(0, col_num, value, excel_formatos['header'])
-                
-            # Configurar altura da linha do cabeçalho
-            worksheet.set_row(0, 30)
-
-            # Formatar dados
-            for row_num, row in df.iterrows():
-                formato_base = excel_formatos['subpasta'] if ' - ' in row['Cliente'] else excel_formatos['cliente']
-                for col_num, value in enumerate(row):
-                    if df.columns[col_num] == 'Data Criação' and row['Precisa Verificar']:
-                        worksheet.write(row_num + 1, col_num, value, excel_formatos['verificar'])
-                    else:
-                        worksheet.write(row_num + 1, col_num, value, formato_base)
-                
-                # Adicionar comentário com o caminho completo
-                worksheet.write_comment(
-                    row_num + 1, 
-                    0, 
-                    row['Caminho'],
-                    {
-                        'x_scale': 2,
-                        'y_scale': 2,
-                        'font_size': 9
-                    }
-                )
+    def escrever_excel_em_fluxo(self, caminho_arquivo, tamanho_bloco=5000):
+        # Linhas vão do sink para a planilha em constant_memory, um bloco por vez; o pico
+        # de memória depende do tamanho do bloco, não do número de pastas
+        try:
+            inicio = time.perf_counter()
+            tempo_leitura = 0.0
+            escritor = EscritorExcel(caminho_arquivo, self.tipos_arquivos, memoria_constante=True,
+                                     caminhos=self.caminhos_excel)
+            try:
+                blocos = self.ler_blocos_resultados(tamanho_bloco)
+                while True:
+                    antes = time.perf_counter()
+                    bloco = next(blocos, None)
+                    tempo_leitura += time.perf_counter() - antes
+                    if bloco is None:
+                        break
+                    escritor.escrever_bloco(bloco)
+            finally:
+                escritor.fechar()
+        except Exception as e:
+            logger.error(f"Erro ao formatar Excel: {str(e)}")
+            raise
 
-            # Ajustar larguras das colunas
-            colunas = {
-                'A:A': 30,  # Cliente
-                'B:B': 15,  # Data Criação
-                'C:C': 15   # Tamanho Total
-            }
-            colunas.update({
-                f'{chr(68+i)}:{chr(68+i)}': 10  # Colunas de tipos de arquivo
-                for i in range(len(self.tipos_arquivos))
-            })
-            
-            for col, width in colunas.items():
-                worksheet.set_column(col, width)
+        self.estatisticas.registrar_fase('dataframe', tempo_leitura, escritor.linhas)
+        self.estatisticas.registrar_fase('excel', time.perf_counter() - inicio - tempo_leitura, escritor.linhas)
+        if not escritor.linhas:
+            os.remove(caminho_arquivo)
+            logger.error("Nenhum dado para gerar relatório")
+            raise ValueError("Não há dados para gerar o relatório")
+        return escritor.linhas
 
-            # Congelar painel superior
-            worksheet.freeze_panes(1, 0)
-            
+    def escrever_parquet(self, caminho_arquivo, df=None):
+        # Sem DataFrame (relatório em fluxo) os blocos vêm direto do sink
+        try:
+            inicio = time.perf_counter()
+            escritor = EscritorParquet(caminho_arquivo, self.tipos_arquivos)
+            try:
+                for bloco in ([df] if df is not None else self.ler_blocos_resultados()):
+                    escritor.escrever_bloco(bloco)
+            finally:
+                escritor.fechar()
+            self.estatisticas.registrar_fase('parquet', time.perf_counter() - inicio, escritor.linhas)
         except Exception as e:
-            logger.error(f"Erro ao formatar Excel: {str(e)}")
+            logger.error(f"Erro ao exportar Parquet: {str(e)}")
             raise
+
+def varrer_cliente_processo(config, caminho, nome):
+    auditoria = AuditoriaServidor.de_configuracao(config)
+    linhas = auditoria.varrer_cliente(caminho, nome)
+    colunas = tuple(linhas[0]) if linhas else ()
+    return (colunas, [tuple(linha.values()) for linha in linhas],
+            auditoria.arquivos_varridos, auditoria.chamadas_stat, auditoria.chamadas_stat_pastas,
+            auditoria.estatisticas.para_dict())
+
 class DashboardAuditoria:
-    def __init__(self, df, local_saida):
+    def __init__(self, df, local_saida, estatisticas=None, perfil=None, historico=None):
+        importar_dashboard()
         self.df = df
         self.local_saida = local_saida
+        self.estatisticas = estatisticas
+        self.historico = historico
+        self.perfil = perfil or PerfilExecucao(None, local_saida)
         self.app = dash.Dash(__name__)
         self.criar_layout()
         
@@ -424,12 +2437,13 @@ class DashboardAuditoria:
                     <div class="graph-container" id="grafico-tamanho"></div>
                     <div class="graph-container" id="grafico-tipos"></div>
                     <div class="graph-container" id="grafico-timeline"></div>
+                    <div class="graph-container" id="grafico-crescimento"></div>
                 </div>
                 <script>
             """
             
             # Adiciona cada gráfico ao HTML
-            for nome, fig in zip(['grafico-tamanho', 'grafico-tipos', 'grafico-timeline'], figuras):
+            for nome, fig in zip(['grafico-tamanho', 'grafico-tipos', 'grafico-timeline', 'grafico-crescimento'], figuras):
                 html_content += f"var plot_{nome} = {fig.to_json()}\n"
                 html_content += f"Plotly.newPlot('{nome}', plot_{nome}.data, plot_{nome}.layout)\n"
             
@@ -469,7 +2483,8 @@ class DashboardAuditoria:
                 html.Div([
                     dcc.Graph(id='grafico-tamanho', style={'marginBottom': '20px'}),
                     dcc.Graph(id='grafico-tipos', style={'marginBottom': '20px'}),
-                    dcc.Graph(id='grafico-timeline')
+                    dcc.Graph(id='grafico-timeline', style={'marginBottom': '20px'}),
+                    dcc.Graph(id='grafico-crescimento')
                 ], style={'width': '70%', 'padding': '20px'})
             ], style={'display': 'flex', 'flexDirection': 'row', 'gap': '20px'})
         ], style={'padding': '20px', 'fontFamily': 'Arial'})
@@ -481,90 +2496,142 @@ class DashboardAuditoria:
             [Output('grafico-tamanho', 'figure'),
              Output('grafico-tipos', 'figure'),
              Output('grafico-timeline', 'figure'),
+             Output('grafico-crescimento', 'figure'),
              Output('info-total', 'children')],
             [Input('filtro-cliente', 'value')]
         )
         def atualizar_graficos(clientes_selecionados):
-            try:
-                df_filtrado = self.df.copy()
-                if clientes_selecionados:
-                    df_filtrado = df_filtrado[df_filtrado['Cliente'].isin(clientes_selecionados)]
-                
-                if len(df_filtrado) == 0:
-                    fig_vazia = go.Figure()
-                    fig_vazia.update_layout(
-                        title='Sem dados para exibir',
-                        annotations=[{
-                            'text': 'Selecione um cliente para visualizar os dados',
-                            'xref': 'paper',
-                            'yref': 'paper',
-                            'showarrow': False,
-                            'font': {'size': 20}
-                        }]
-                    )
-                    info_total = html.Div([
-                        html.H4("Sem dados para exibir"),
-                        html.P("Selecione um cliente para visualizar as informações")
-                    ])
-                    return fig_vazia, fig_vazia, fig_vazia, info_total
-                
-                # Gráfico de tamanho (TreeMap)
-                fig_tamanho = px.treemap(
-                    df_filtrado,
-                    path=['Cliente'],
-                    values='Tamanho Total (GB)',
-                    title='Distribuição de Espaço em Disco',
-                    custom_data=['Cliente', 'Tamanho Total (GB)']
-                )
-                fig_tamanho.update_traces(
-                    textinfo="label+value",
-                    hovertemplate="<b>%{customdata[0]}</b><br>Tamanho: %{customdata[1]:.2f} GB"
-                )
-                
-                # Gráfico de tipos de arquivo
-                tipos_arquivo = df_filtrado.iloc[:, 3:-1].apply(
-                    lambda x: (x == 'Sim').sum()
-                )
-                fig_tipos = px.bar(
-                    x=tipos_arquivo.index,
-                    y=tipos_arquivo.values,
-                    title='Quantidade de Arquivos por Tipo',
-                    labels={'x': 'Tipo de Arquivo', 'y': 'Quantidade'}
-                )
-                fig_tipos.update_traces(
-                    texttemplate='%{y}',
-                    textposition='outside'
-                )
-                
-                # Gráfico timeline
-                fig_timeline = px.scatter(
-                    df_filtrado,
-                    x='Data Criação',
-                    y='Tamanho Total (GB)',
-                    size='Tamanho Total (GB)',
-                    color='Cliente',
-                    title='Timeline de Crescimento',
-                    hover_data=['Cliente', 'Tamanho Total (GB)']
+            with self.perfil.fase('dashboard'):
+                return self.montar_graficos(clientes_selecionados)
+
+    def montar_graficos(self, clientes_selecionados):
+        try:
+            inicio = time.perf_counter()
+            df_filtrado = self.df.copy()
+            if clientes_selecionados:
+                df_filtrado = df_filtrado[df_filtrado['Cliente'].isin(clientes_selecionados)]
+            
+            if len(df_filtrado) == 0:
+                fig_vazia = go.Figure()
+                fig_vazia.update_layout(
+                    title='Sem dados para exibir',
+                    annotations=[{
+                        'text': 'Selecione um cliente para visualizar os dados',
+                        'xref': 'paper',
+                        'yref': 'paper',
+                        'showarrow': False,
+                        'font': {'size': 20}
+                    }]
                 )
-                
-                # Informações totais
-                total_tamanho = df_filtrado['Tamanho Total (GB)'].sum()
-                total_pastas = len(df_filtrado)
                 info_total = html.Div([
-                    html.H4("Informações Totais"),
-                    html.P(f"Tamanho Total: {total_tamanho:.2f} GB"),
-                    html.P(f"Total de Pastas: {total_pastas}")
+                    html.H4("Sem dados para exibir"),
+                    html.P("Selecione um cliente para visualizar as informações")
                 ])
-                
-                # Salva o dashboard atual
-                self.salvar_dashboard(df_filtrado, [fig_tamanho, fig_tipos, fig_timeline])
-                
-                return fig_tamanho, fig_tipos, fig_timeline, info_total
-                
-            except Exception as e:
-                logger.error(f"Erro ao atualizar gráficos: {str(e)}")
-                raise
+                return fig_vazia, fig_vazia, fig_vazia, fig_vazia, info_total
+            
+            # Gráfico de tamanho (TreeMap)
+            fig_tamanho = px.treemap(
+                df_filtrado,
+                path=['Cliente'],
+                values='Tamanho Total (GB)',
+                title='Distribuição de Espaço em Disco',
+                custom_data=['Cliente', 'Tamanho Total (GB)']
+            )
+            fig_tamanho.update_traces(
+                textinfo="label+value",
+                hovertemplate="<b>%{customdata[0]}</b><br>Tamanho: %{customdata[1]:.2f} GB"
+            )
+            
+            # Gráfico de tipos de arquivo
+            colunas_tipos = [coluna for coluna in df_filtrado.columns if coluna.startswith('.')]
+            tipos_arquivo = df_filtrado[colunas_tipos].apply(
+                lambda x: (x == 'Sim').sum()
+            )
+            fig_tipos = px.bar(
+                x=tipos_arquivo.index,
+                y=tipos_arquivo.values,
+                title='Quantidade de Arquivos por Tipo',
+                labels={'x': 'Tipo de Arquivo', 'y': 'Quantidade'}
+            )
+            fig_tipos.update_traces(
+                texttemplate='%{y}',
+                textposition='outside'
+            )
+            
+            # Gráfico timeline
+            fig_timeline = px.scatter(
+                df_filtrado,
+                x='Data Criação',
+                y='Tamanho Total (GB)',
+                size='Tamanho Total (GB)',
+                color='Cliente',
+                title='Datas de Criação das Pastas',
+                hover_data=['Cliente', 'Tamanho Total (GB)']
+            )
+
+            # Crescimento real entre execuções e previsão
+            fig_crescimento, textos_previsao = self.grafico_crescimento(clientes_selecionados)
+            
+            # Informações totais
+            total_tamanho = df_filtrado['Tamanho Total (GB)'].sum()
+            total_pastas = len(df_filtrado)
+            info_total = html.Div([
+                html.H4("Informações Totais"),
+                html.P(f"Tamanho Total: {total_tamanho:.2f} GB"),
+                html.P(f"Total de Pastas: {total_pastas}"),
+                *[html.P(texto) for texto in textos_previsao]
+            ])
+            if self.estatisticas is not None:
+                self.estatisticas.registrar_fase('dashboard', time.perf_counter() - inicio, 4)
+                self.estatisticas.salvar()
+            
+            # Salva o dashboard atual
+            self.salvar_dashboard(df_filtrado, [fig_tamanho, fig_tipos, fig_timeline, fig_crescimento])
+            
+            return fig_tamanho, fig_tipos, fig_timeline, fig_crescimento, info_total
+            
+        except Exception as e:
+            logger.error(f"Erro ao atualizar gráficos: {str(e)}")
+            raise
     
+    def grafico_crescimento(self, clientes_selecionados):
+        # Só indexa as séries e projeções já calculadas pelo HistoricoCrescimento; sem
+        # clientes selecionados mostra o total do compartilhamento
+        fig = go.Figure()
+        fig.update_layout(title='Crescimento e Previsão', xaxis_title='Execução', yaxis_title='Tamanho (GB)')
+        previsoes = []
+        if self.historico is not None:
+            nomes = [nome for nome in (clientes_selecionados or []) if nome in self.historico.linha]
+            previsoes = [p for p in map(self.historico.previsao, nomes or [HistoricoCrescimento.TOTAL]) if p]
+        if not previsoes:
+            fig.update_layout(annotations=[{
+                'text': 'São necessárias pelo menos duas execuções no banco de resultados',
+                'xref': 'paper',
+                'yref': 'paper',
+                'showarrow': False,
+                'font': {'size': 16}
+            }])
+            return fig, []
+
+        textos = []
+        capacidades = set()
+        for p in previsoes:
+            fig.add_trace(go.Scatter(x=p['datas'], y=p['tamanhos_gb'], mode='lines+markers', name=p['nome']))
+            fig.add_trace(go.Scatter(
+                x=p['datas_projecao'], y=p['projecao_gb'], mode='lines', line={'dash': 'dash'},
+                name=f"{p['nome']} (previsão {p['modelo']})"
+            ))
+            if p['capacidade_gb'] > 0:
+                capacidades.add(p['capacidade_gb'])
+                if p['excedida']:
+                    textos.append(f"{p['nome']}: capacidade de {p['capacidade_gb']:.0f} GB já ultrapassada")
+                elif str(p['cruzamento']) != 'NaT':
+                    textos.append(f"{p['nome']}: {p['capacidade_gb']:.0f} GB em {str(p['cruzamento'])[:10]} "
+                                  f"(ajuste {p['modelo']})")
+        for capacidade in capacidades:
+            fig.add_hline(y=capacidade, line_dash='dot', annotation_text=f"Capacidade {capacidade:.0f} GB")
+        return fig, textos
+
     def executar(self):
         try:
             logger.info("Iniciando servidor do Dashboard...")
@@ -574,19 +2641,136 @@ class DashboardAuditoria:
             raise
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auditoria de dados do servidor")
+    parser.add_argument('--root',
+                        help="pasta a auditar; se informada, roda sem diálogos nem prompts (cron)")
+    parser.add_argument('--out',
+                        help="pasta onde salvar relatório, cache e journal (padrão no modo sem "
+                             "interface: diretório atual)")
+    parser.add_argument('--types',
+                        help="extensões separadas por vírgula, por exemplo .fls,.e57,.las "
+                             "(padrão no modo sem interface: tipos padrão)")
+    parser.add_argument('--no-dashboard', action='store_true',
+                        help="encerra após gerar o relatório, sem subir o servidor do dashboard")
+    parser.add_argument('--workers', type=int,
+                        help="trabalhadores (threads ou processos) da varredura")
+    parser.add_argument('--motor', choices=['threads', 'asyncio', 'processos'], default='threads',
+                        help="motor de varredura")
+    parser.add_argument('--concorrencia', type=int, default=64,
+                        help="listagens simultâneas no motor asyncio")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="ignora o cache de varredura e lista todas as pastas de novo")
+    parser.add_argument('--cache-max-dias', type=float, metavar='DIAS',
+                        help="relista pastas cuja entrada no cache tem mais que DIAS dias, para "
+                             "pegar arquivos alterados no lugar (que não mudam o mtime da pasta)")
+    parser.add_argument('--resume', action='store_true',
+                        help="retoma uma auditoria interrompida a partir do journal em local_saida")
+    parser.add_argument('--saida-resultados', choices=sorted(SINKS_RESULTADOS), default='memoria',
+                        help="grava as linhas em fluxo num arquivo em vez de mantê-las na memória")
+    parser.add_argument('--excel-em-fluxo', action='store_true',
+                        help="escreve o Excel em constant_memory direto do sink, bloco a bloco, sem "
+                             "montar o DataFrame completo (implica --saida-resultados jsonl se "
+                             "nenhum arquivo for escolhido)")
+    parser.add_argument('--caminhos-excel', choices=EscritorExcel.CAMINHOS, default='coluna',
+                        help="caminho completo na coluna 'Caminho' como texto (padrão), como "
+                             "hyperlink ou também como comentário na coluna A (lento em relatórios grandes)")
+    parser.add_argument('--exportar-parquet', action='store_true',
+                        help="grava também um .tipado.parquet (zstd) ao lado do relatório, para "
+                             "pandas/DuckDB (requer pyarrow)")
+    parser.add_argument('--banco-resultados',
+                        help="banco SQLite onde cada execução é registrada (padrão: "
+                             "auditorias.sqlite em local_saida)")
+    parser.add_argument('--sem-banco-resultados', action='store_true',
+                        help="não registra a execução no banco de resultados")
+    parser.add_argument('--diff', nargs='*', type=int, metavar='EXECUCAO',
+                        help="compara duas execuções do banco de resultados (ids da antiga e da "
+                             "nova; sem ids, as duas últimas concluídas da --root) e grava um CSV "
+                             "com as variações por cliente e subpasta, sem varrer")
+    parser.add_argument('--capacidade-cliente', type=float, metavar='GB',
+                        help="capacidade por cliente usada na previsão de crescimento")
+    parser.add_argument('--capacidade-total', type=float, metavar='GB',
+                        help="capacidade do compartilhamento usada na previsão de crescimento")
+    parser.add_argument('--deduplicar-hardlinks', action='store_true',
+                        help="conta cada inode uma vez e adiciona a coluna 'Tamanho Único (GB)'")
+    parser.add_argument('--profile', nargs='?', const='amostragem', choices=PerfilExecucao.MODOS,
+                        help="perfila varredura, relatório e callbacks do dashboard; 'amostragem' "
+                             "(padrão) grava pilhas colapsadas para flamegraph, 'cprofile' grava "
+                             ".pstats (processos do motor 'processos' não são perfilados)")
+    parser.add_argument('--intervalo-perfil', type=float, default=10,
+                        help="intervalo entre amostras do --profile amostragem, em milissegundos")
+    args = parser.parse_args()
+
+    sem_interface = args.root is not None
+    if sem_interface and not os.path.isdir(args.root):
+        parser.error(f"--root não é uma pasta: {args.root}")
+    tipos = args.types.split(',') if args.types else None
+    if sem_interface:
+        tipos = tipos or TIPOS_PADRAO
+        local_saida = args.out or os.getcwd()
+        os.makedirs(local_saida, exist_ok=True)
+    else:
+        local_saida = args.out
+
+    if args.diff is not None:
+        if len(args.diff) not in (0, 2):
+            parser.error("--diff recebe nenhuma ou duas execuções")
+        saida_diferenca = args.out or os.getcwd()
+        try:
+            gerar_diferenca(args.banco_resultados or os.path.join(saida_diferenca, 'auditorias.sqlite'),
+                            saida_diferenca, args.diff, args.root)
+        except Exception as e:
+            logger.error(f"Erro ao comparar execuções: {str(e)}")
+            sys.exit(1)
+        sys.exit(0)
+
     try:
         logger.info("Iniciando auditoria de dados...")
-        auditoria = AuditoriaServidor()
+        auditoria = AuditoriaServidor(
+            max_workers=args.workers,
+            motor=args.motor,
+            concorrencia_listagem=args.concorrencia,
+            retomar=args.resume,
+            saida_resultados=args.saida_resultados,
+            deduplicar_hardlinks=args.deduplicar_hardlinks,
+            pasta_raiz=args.root,
+            local_saida=local_saida,
+            tipos_arquivos=tipos,
+            relatorio_em_fluxo=args.excel_em_fluxo,
+            caminhos_excel=args.caminhos_excel,
+            exportar_parquet=args.exportar_parquet,
+            usar_banco=not args.sem_banco_resultados,
+            caminho_banco=args.banco_resultados,
+            usar_cache=not args.sem_cache,
+            idade_maxima_cache=args.cache_max_dias
+        )
         
+        perfil = PerfilExecucao(args.profile, auditoria.local_saida, args.intervalo_perfil / 1000)
+        if args.profile:
+            logger.info(f"Perfil ({args.profile}) será gravado em: {perfil.caminho}")
+
         logger.info("Executando auditoria...")
-        auditoria.executar_auditoria()
+        with perfil.fase('executar_auditoria'):
+            auditoria.executar_auditoria()
         
         logger.info("Gerando relatório Excel...")
-        df = auditoria.gerar_relatorio()
+        with perfil.fase('gerar_relatorio'):
+            df = auditoria.gerar_relatorio()
+
+        historico = None
+        if auditoria.banco is not None and not auditoria.banco.falhou:
+            try:
+                historico = HistoricoCrescimento(auditoria.banco.caminho_banco, auditoria.pasta_raiz,
+                                                 args.capacidade_cliente, args.capacidade_total)
+                historico.registrar_previsoes()
+            except Exception as e:
+                logger.warning(f"Histórico de crescimento indisponível: {str(e)}")
         
-        logger.info("Iniciando Dashboard...")
-        dashboard = DashboardAuditoria(df, auditoria.local_saida)
-        dashboard.executar()
+        if not args.no_dashboard:
+            logger.info("Iniciando Dashboard...")
+            if df is None:
+                df = auditoria.carregar_resultados()
+            dashboard = DashboardAuditoria(df, auditoria.local_saida, auditoria.estatisticas, perfil, historico)
+            dashboard.executar()
         
     except KeyboardInterrupt:
         logger.info("\nEncerrando aplicação...")
@@ -0,0 +1,221 @@
+"""
+Auditoria de Dados do Servidor - benchmark de varredura
+Copyright (C) 2025 Caio Valerio Goulart Correia
+Este programa é licenciado sob os termos da GNU AGPL v3.0
+
+Gera uma árvore sintética parecida com o compartilhamento de clientes (pastas de
+cliente, subpastas diretas, Scan_*/log, WorkspaceData e os tipos padrão) e mede
+cada fase da auditoria sobre ela, em arquivos/s e pastas/s.
+
+    python benchmark_auditoria.py --gerar /tmp/arvore --clientes 40 --arquivos 30
+    python benchmark_auditoria.py --root /tmp/arvore --motores threads,asyncio,processos
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import importlib.util
+from datetime import datetime, timedelta
+
+SCRIPT_AUDITORIA = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'Auditoria_dados_Servidor_V2.4(Com_DashBoard).py'
+)
+
+EXTENSOES_RUIDO = ['.txt', '.jpg', '.pdf', '.xml', '.ini', '']
+
+def carregar_auditoria():
+    # O nome do script tem parênteses, então é carregado pelo caminho; o basicConfig daqui
+    # vem antes do dele e evita que o benchmark escreva no auditoria.log
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    spec = importlib.util.spec_from_file_location('auditoria_v24', SCRIPT_AUDITORIA)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+def gerar_arvore(destino, clientes=20, subpastas=5, profundidade=3, ramificacao=2,
+                 arquivos=20, tamanho_maximo=4096, fracao_scan=0.5, semente=0):
+    # Arquivos acima de 64 KiB são criados esparsos (truncate) para não encher o disco
+    rng = random.Random(semente)
+    tipos = ['.fls', '.lsproj', '.dwg', '.imp', '.rcp', '.dxf', '.rvt', '.pts', '.e57',
+             '.las', '.nwd', '.ptx']
+    totais = {'clientes': clientes, 'pastas': 0, 'arquivos': 0, 'bytes': 0}
+    data_base = datetime(2020, 1, 1)
+
+    def criar_arquivos(pasta, quantidade):
+        for i in range(quantidade):
+            ext = rng.choice(tipos) if rng.random() < 0.3 else rng.choice(EXTENSOES_RUIDO)
+            if rng.random() < 0.1:
+                ext = ext.upper()
+            tamanho = rng.randint(0, tamanho_maximo)
+            with open(os.path.join(pasta, f'arquivo_{i:04d}{ext}'), 'wb') as f:
+                if tamanho > 65536:
+                    f.truncate(tamanho)
+                else:
+                    f.write(b'\0' * tamanho)
+            totais['arquivos'] += 1
+            totais['bytes'] += tamanho
+
+    def criar_pasta(pasta):
+        os.makedirs(pasta, exist_ok=True)
+        totais['pastas'] += 1
+
+    def criar_nivel(pasta, nivel):
+        criar_arquivos(pasta, arquivos)
+        if nivel >= profundidade:
+            return
+        for k in range(ramificacao):
+            filha = os.path.join(pasta, f'Nivel{nivel}_{k}')
+            criar_pasta(filha)
+            criar_nivel(filha, nivel + 1)
+
+    for c in range(clientes):
+        cliente = os.path.join(destino, f'Cliente_{c:03d}')
+        criar_pasta(cliente)
+        criar_arquivos(cliente, max(arquivos // 4, 1))
+        for s in range(subpastas):
+            projeto = os.path.join(cliente, f'Projeto_{s:02d}')
+            criar_pasta(projeto)
+            sorteio = rng.random()
+            if sorteio < fracao_scan:
+                scan = os.path.join(projeto, f'Scan_{s:03d}')
+                criar_pasta(scan)
+                data = data_base + timedelta(days=rng.randint(0, 1500))
+                # Parte dos logs é inválida para exercitar o fallback para WorkspaceData/ctime
+                primeira = data.strftime('%d/%m/%Y %H:%M:%S') if rng.random() < 0.9 else 'sem data'
+                with open(os.path.join(scan, 'log'), 'w', encoding='utf-8') as f:
+                    f.write(f"{primeira} Início do scan\nfim\n")
+                totais['arquivos'] += 1
+            elif sorteio < fracao_scan + (1 - fracao_scan) / 2:
+                criar_pasta(os.path.join(projeto, 'WorkspaceData'))
+            criar_nivel(projeto, 1)
+    return totais
+
+def percorrer_arvore(raiz, com_stat=False):
+    pastas = arquivos = 0
+    pilha = [raiz]
+    while pilha:
+        try:
+            with os.scandir(pilha.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pilha.append(entry.path)
+                        continue
+                    arquivos += 1
+                    if com_stat:
+                        entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        pastas += 1
+    return pastas, arquivos
+
+def classificar_nomes(modulo, nomes):
+    tipos_set = set(modulo.TIPOS_PADRAO)
+    extensao_arquivo = modulo.extensao_arquivo
+    return sum(extensao_arquivo(nome) in tipos_set for nome in nomes)
+
+def ler_logs(modulo, niveis):
+    ler_data_log_scan = modulo.AuditoriaServidor.ler_data_log_scan
+    return sum(ler_data_log_scan(pasta, dirs) is not None for pasta, dirs in niveis)
+
+def nova_auditoria(modulo, raiz, local_saida, motor, workers, usar_cache):
+    auditoria = modulo.AuditoriaServidor(
+        max_workers=workers, motor=motor, pasta_raiz=raiz,
+        local_saida=local_saida, tipos_arquivos=modulo.TIPOS_PADRAO
+    )
+    auditoria.usar_cache = usar_cache
+    return auditoria
+
+def medir(nome, funcao, fases):
+    inicio = time.perf_counter()
+    retorno = funcao()
+    fases.append((nome, time.perf_counter() - inicio))
+    return retorno
+
+def executar_benchmark(raiz, motores=('threads',), workers=None, com_excel=True):
+    modulo = carregar_auditoria()
+    fases = []
+    pastas, arquivos = medir('listagem (scandir)', lambda: percorrer_arvore(raiz), fases)
+    medir('listagem + stat', lambda: percorrer_arvore(raiz, com_stat=True), fases)
+    # Classificação e logs são medidos isolados, sobre nomes já listados
+    niveis, nomes = [], []
+    for pasta, dirs, files in os.walk(raiz):
+        niveis.append((pasta, dirs))
+        nomes.extend(files)
+    medir('classificação de extensões', lambda: classificar_nomes(modulo, nomes), fases)
+    medir('leitura dos logs Scan_', lambda: ler_logs(modulo, niveis), fases)
+
+    with tempfile.TemporaryDirectory() as local_saida:
+        auditoria = None
+        for motor in motores:
+            auditoria = nova_auditoria(modulo, raiz, local_saida, motor, workers, usar_cache=False)
+            medir(f'varredura completa ({motor})', auditoria.executar_auditoria, fases)
+
+        cache = nova_auditoria(modulo, raiz, local_saida, motores[0], workers, usar_cache=True)
+        cache.executar_auditoria()
+        medir(f'varredura com cache quente ({motores[0]})', cache.executar_auditoria, fases)
+
+        if com_excel:
+            importlib.import_module('pandas')
+            medir('DataFrame', auditoria.carregar_resultados, fases)
+            medir('relatório Excel (DataFrame + escrita)', auditoria.gerar_relatorio, fases)
+    return pastas, arquivos, fases
+
+def imprimir_relatorio(pastas, arquivos, fases):
+    print(f"\nÁrvore: {pastas} pastas, {arquivos} arquivos")
+    print(f"{'Fase':<44}{'tempo (s)':>11}{'arquivos/s':>14}{'pastas/s':>12}")
+    for nome, segundos in fases:
+        segundos = max(segundos, 1e-9)
+        print(f"{nome:<44}{segundos:>11.3f}{arquivos / segundos:>14,.0f}{pastas / segundos:>12,.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da varredura sobre uma árvore sintética")
+    parser.add_argument('--root', help="árvore já existente a medir")
+    parser.add_argument('--gerar', help="pasta vazia onde gerar (e manter) a árvore sintética")
+    parser.add_argument('--clientes', type=int, default=20)
+    parser.add_argument('--subpastas', type=int, default=5, help="subpastas diretas por cliente")
+    parser.add_argument('--profundidade', type=int, default=3)
+    parser.add_argument('--ramificacao', type=int, default=2, help="pastas filhas por nível")
+    parser.add_argument('--arquivos', type=int, default=20, help="arquivos por pasta")
+    parser.add_argument('--tamanho-maximo', type=int, default=4096, help="bytes por arquivo")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--motores', default='threads',
+                        help="motores separados por vírgula: threads,asyncio,processos")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--sem-excel', action='store_true', help="não mede DataFrame e Excel")
+    args = parser.parse_args()
+
+    raiz = args.root
+    temporaria = None
+    if raiz is None:
+        if args.gerar:
+            raiz = args.gerar
+            if os.path.isdir(raiz) and os.listdir(raiz):
+                parser.error(f"--gerar precisa de uma pasta vazia ou inexistente: {raiz}")
+        else:
+            raiz = temporaria = tempfile.mkdtemp(prefix='arvore_auditoria_')
+        inicio = time.perf_counter()
+        totais = gerar_arvore(
+            raiz, args.clientes, args.subpastas, args.profundidade, args.ramificacao,
+            args.arquivos, args.tamanho_maximo, semente=args.semente
+        )
+        print(f"Árvore gerada em {raiz} ({time.perf_counter() - inicio:.1f}s): "
+              f"{totais['clientes']} clientes, {totais['pastas']} pastas, "
+              f"{totais['arquivos']} arquivos, {totais['bytes'] / 1024 ** 2:.1f} MiB")
+
+    try:
+        imprimir_relatorio(*executar_benchmark(
+            raiz, tuple(args.motores.split(',')), args.workers, not args.sem_excel
+        ))
+    finally:
+        if temporaria is not None:
+            shutil.rmtree(temporaria, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
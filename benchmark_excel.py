@@ -0,0 +1,98 @@
+"""
+Auditoria de Dados do Servidor - benchmark do relatório Excel
+Copyright (C) 2025 Caio Valerio Goulart Correia
+Este programa é licenciado sob os termos da GNU AGPL v3.0
+
+Gera linhas sintéticas no formato do relatório e mede, para cada forma de exibir
+o caminho completo (coluna de texto, hyperlink ou comentário por linha), o tempo
+de escrita do EscritorExcel e o tamanho do .xlsx gerado.
+
+    python benchmark_excel.py --linhas 10000,100000
+    python benchmark_excel.py --linhas 100000 --caminhos coluna,link
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from benchmark_auditoria import carregar_auditoria
+
+def gerar_linhas(tipos_arquivos, quantidade, semente=0):
+    # Mesmas colunas de montar_linha: um cliente a cada 20 linhas, o resto subpastas dele
+    import pandas as pd
+    rng = random.Random(semente)
+    data_base = datetime(2020, 1, 1)
+    linhas = []
+    for i in range(quantidade):
+        cliente = f'Cliente_{i // 20:05d}'
+        nome = cliente if i % 20 == 0 else f'{cliente} - Projeto_{i % 20:02d}'
+        caminho = os.path.join(r'\\servidor\Clientes', cliente, *([f'Projeto_{i % 20:02d}'] if i % 20 else []))
+        precisa_verificar = rng.random() < 0.2
+        tamanho = rng.randint(0, 500 * 1024 ** 3)
+        alocado = rng.randint(0, tamanho)
+        linhas.append({
+            'Cliente': nome,
+            'Data Criação': (data_base + timedelta(days=rng.randint(0, 1500))).strftime('%d/%m/%Y'),
+            'Precisa Verificar': precisa_verificar,
+            'Tamanho Total (GB)': round(tamanho / 1024 ** 3, 2),
+            'Tamanho Total (bytes)': tamanho,
+            'Tamanho Alocado (GB)': round(alocado / 1024 ** 3, 2),
+            'Tamanho Alocado (bytes)': alocado,
+            'Arquivos Esparsos': rng.randint(0, 3),
+            **{tipo: 'Sim' if rng.random() < 0.3 else 'Não' for tipo in tipos_arquivos},
+            'Caminho': caminho
+        })
+    df = pd.DataFrame(linhas)
+    for tipo in tipos_arquivos:
+        df[tipo] = pd.Categorical(df[tipo], categories=['Sim', 'Não'])
+    return df
+
+def medir_escrita(modulo, df, caminho, caminhos):
+    inicio = time.perf_counter()
+    escritor = modulo.EscritorExcel(caminho, modulo.TIPOS_PADRAO, caminhos=caminhos)
+    try:
+        escritor.escrever_cabecalho(df.columns)
+        escritor.escrever_bloco(df)
+    finally:
+        escritor.fechar()
+    return time.perf_counter() - inicio, os.path.getsize(caminho)
+
+def executar_benchmark(quantidades, modos):
+    modulo = carregar_auditoria()
+    resultados = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for quantidade in quantidades:
+            df = gerar_linhas(modulo.TIPOS_PADRAO, quantidade)
+            for modo in modos:
+                caminho = os.path.join(pasta, f'relatorio_{quantidade}_{modo}.xlsx')
+                segundos, tamanho = medir_escrita(modulo, df, caminho, modo)
+                resultados.append((quantidade, modo, segundos, tamanho))
+                os.remove(caminho)
+    return resultados
+
+def imprimir_relatorio(resultados):
+    print(f"\n{'Linhas':>8}  {'Caminho':<12}{'tempo (s)':>11}{'linhas/s':>12}{'tamanho (MiB)':>15}")
+    for quantidade, modo, segundos, tamanho in resultados:
+        segundos = max(segundos, 1e-9)
+        print(f"{quantidade:>8}  {modo:<12}{segundos:>11.2f}{quantidade / segundos:>12,.0f}"
+              f"{tamanho / 1024 ** 2:>15.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de escrita e tamanho do relatório Excel")
+    parser.add_argument('--linhas', default='10000,100000',
+                        help="quantidades de linhas separadas por vírgula")
+    parser.add_argument('--caminhos', default='coluna,link,comentario',
+                        help="formas de exibir o caminho separadas por vírgula: coluna,link,comentario")
+    args = parser.parse_args()
+
+    modos = args.caminhos.split(',')
+    invalidos = [modo for modo in modos if modo not in ('coluna', 'link', 'comentario')]
+    if invalidos:
+        parser.error(f"forma de caminho desconhecida: {', '.join(invalidos)}")
+    imprimir_relatorio(executar_benchmark([int(n) for n in args.linhas.split(',')], modos))
+
+if __name__ == "__main__":
+    main()
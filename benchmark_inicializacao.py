@@ -0,0 +1,93 @@
+"""
+Auditoria de Dados do Servidor - benchmark de inicialização
+Copyright (C) 2025 Caio Valerio Goulart Correia
+Este programa é licenciado sob os termos da GNU AGPL v3.0
+
+Mede, em processos novos, o tempo entre o lançamento do Python e o início da
+primeira varredura: "antes" reproduz a inicialização original (pip freeze e
+imports de pandas, tkinter, dash e plotly no carregamento do módulo) e "depois"
+carrega o script atual e verifica as dependências com importlib.util.find_spec.
+
+    python benchmark_inicializacao.py --root /mnt/Clientes --repeticoes 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+SCRIPT_AUDITORIA = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'Auditoria_dados_Servidor_V2.4(Com_DashBoard).py'
+)
+
+MARCADOR = 'PRIMEIRA_VARREDURA'
+
+CODIGO_ANTES = '''
+import os, sys, subprocess
+import pandas as pd
+import tkinter as tk
+from tkinter import filedialog
+from tqdm.auto import tqdm
+import dash
+from dash import dcc, html
+from dash.dependencies import Input, Output
+import plotly.express as px
+import plotly.graph_objects as go
+subprocess.check_output([sys.executable, "-m", "pip", "freeze"], stderr=subprocess.DEVNULL)
+next(iter(os.scandir(sys.argv[1])), None)
+print("{marcador}", flush=True)
+'''.format(marcador=MARCADOR)
+
+CODIGO_DEPOIS = '''
+import os, sys, importlib.util
+spec = importlib.util.spec_from_file_location("auditoria", sys.argv[2])
+modulo = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(modulo)
+modulo.AuditoriaServidor.instalar_dependencias()
+next(iter(os.scandir(sys.argv[1])), None)
+print("{marcador}", flush=True)
+'''.format(marcador=MARCADOR)
+
+def medir(codigo, raiz, repeticoes):
+    tempos = []
+    # Roda fora do repositório para não misturar o auditoria.log do benchmark
+    with tempfile.TemporaryDirectory() as pasta_trabalho:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            processo = subprocess.Popen(
+                [sys.executable, '-c', codigo, raiz, SCRIPT_AUDITORIA],
+                cwd=pasta_trabalho, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
+            for linha in processo.stdout:
+                if linha.strip() == MARCADOR:
+                    tempos.append(time.perf_counter() - inicio)
+                    break
+            processo.stdout.close()
+            processo.wait()
+            if processo.returncode != 0:
+                raise RuntimeError(f"Processo de medição terminou com código {processo.returncode}")
+    return tempos
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência de inicialização até a primeira varredura")
+    parser.add_argument('--root', default=os.getcwd(), help="pasta usada na primeira varredura")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    resultados = {
+        'antes (pip freeze + imports no módulo)': medir(CODIGO_ANTES, args.root, args.repeticoes),
+        'depois (find_spec + imports tardios)': medir(CODIGO_DEPOIS, args.root, args.repeticoes),
+    }
+
+    print(f"\n{'Inicialização':<42}{'mediana (s)':>12}{'mínimo (s)':>12}")
+    for nome, tempos in resultados.items():
+        print(f"{nome:<42}{statistics.median(tempos):>12.3f}{min(tempos):>12.3f}")
+    antes, depois = (statistics.median(t) for t in resultados.values())
+    print(f"\nGanho: {antes / depois:.1f}x mais rápido até a primeira varredura")
+
+if __name__ == "__main__":
+    main()
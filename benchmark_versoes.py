@@ -0,0 +1,225 @@
+"""
+Auditoria de Dados do Servidor - benchmark entre versões
+Copyright (C) 2025 Caio Valerio Goulart Correia
+Este programa é licenciado sob os termos da GNU AGPL v3.0
+
+Extrai, via AST, as funções de varredura de cada script histórico (V0.2 a V2.3
+e scanner_auditoria.py) sem executar o código de módulo (diálogos do tkinter,
+input(), wmi, pip) e as roda sobre a mesma árvore sintética, uma pasta por vez e
+numa única thread, para comparar a vazão de cada estratégia.
+
+    python benchmark_versoes.py --clientes 20 --repeticoes 3
+    python benchmark_versoes.py --root /tmp/arvore
+"""
+
+import os
+import re
+import ast
+import glob
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+from functools import lru_cache
+
+from benchmark_auditoria import carregar_auditoria, gerar_arvore, percorrer_arvore
+
+PASTA_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+
+# Métodos que abrem diálogos, pedem input, instalam pacotes ou geram relatório
+METODOS_IGNORADOS = {
+    '__init__', 'instalar_dependencias', 'selecionar_tipos_arquivos', 'selecionar_pasta_raiz',
+    'selecionar_local_saida', 'executar_auditoria', 'gerar_relatorio', 'formatar_excel'
+}
+
+PASTAS_SISTEMA = {'System Volume Information', '$RECYCLE.BIN', 'Recovery', 'Config.Msi'}
+
+# Os erros das versões antigas aparecem na coluna de falhas, não no terminal
+LOGGER_VERSOES = logging.getLogger('benchmark_versoes')
+LOGGER_VERSOES.setLevel(logging.CRITICAL)
+
+def versao_script(caminho):
+    encontrado = re.search(r'_V(\d+)\.(\d+)', os.path.basename(caminho))
+    return (int(encontrado.group(1)), int(encontrado.group(2))) if encontrado else (0, 0)
+
+def listar_scripts():
+    scripts = glob.glob(os.path.join(PASTA_SCRIPTS, 'Auditoria_dados_Servidor_V*.py'))
+    # A V2.4 não tem efeitos colaterais ao importar e é medida pelo próprio módulo
+    scripts = [s for s in scripts if versao_script(s) < (2, 4)]
+    scanner = os.path.join(PASTA_SCRIPTS, 'scanner_auditoria.py')
+    if os.path.exists(scanner):
+        scripts.append(scanner)
+    return sorted(scripts, key=versao_script)
+
+def nome_versao(caminho):
+    versao = versao_script(caminho)
+    return f"V{versao[0]}.{versao[1]}" if versao != (0, 0) else os.path.splitext(os.path.basename(caminho))[0]
+
+def extrair_estrategia(caminho, tipos_arquivos):
+    # Mantém apenas as funções de nível de módulo e os métodos de varredura da classe;
+    # definir funções não executa nada, então o restante do script é descartado
+    with open(caminho, 'r', encoding='utf-8') as f:
+        arvore = ast.parse(f.read(), filename=caminho)
+
+    corpo = []
+    for no in arvore.body:
+        if isinstance(no, ast.FunctionDef):
+            corpo.append(no)
+        elif isinstance(no, ast.ClassDef) and no.name == 'AuditoriaServidor':
+            no.body = [
+                metodo for metodo in no.body
+                if isinstance(metodo, ast.FunctionDef) and metodo.name not in METODOS_IGNORADOS
+            ]
+            corpo.append(no)
+
+    namespace = {
+        '__name__': f"versao_{nome_versao(caminho).replace('.', '_')}",
+        'os': os, 'datetime': datetime, 'lru_cache': lru_cache,
+        'logger': LOGGER_VERSOES,
+        'tipos_arquivos': list(tipos_arquivos),
+    }
+    exec(compile(ast.Module(body=corpo, type_ignores=[]), caminho, 'exec'), namespace)
+
+    classe = namespace.get('AuditoriaServidor')
+    if classe is not None:
+        auditoria = classe.__new__(classe)
+        auditoria.tipos_arquivos = list(tipos_arquivos)
+        auditoria.tipos_set = set(tipos_arquivos)
+        auditoria.pastas_sistema = set(PASTAS_SISTEMA)
+        auditoria.dados_excel = []
+        auditoria.max_workers = 1
+        auditoria.chunk_size = 10
+        if hasattr(auditoria, 'processar_pasta_paralelo'):
+            return lambda caminho, nome, is_subpasta: auditoria.processar_pasta_paralelo(
+                (caminho, nome, is_subpasta))
+        return auditoria.processar_pasta
+
+    verificar = namespace['verificar_arquivos']
+    calcular = namespace['calcular_tamanho_pasta']
+    obter_data = namespace.get('obter_data_criacao')
+
+    def processar(caminho, nome, is_subpasta):
+        resultado = {'arquivos': verificar(caminho), 'tamanho': calcular(caminho)}
+        if obter_data is not None:
+            resultado['data'] = obter_data(caminho)
+        return resultado
+    return processar
+
+def estrategia_v24(modulo, raiz, tipos_arquivos):
+    config = {
+        'tipos_arquivos': list(tipos_arquivos), 'pastas_sistema': set(PASTAS_SISTEMA),
+        'pasta_raiz': raiz, 'local_saida': tempfile.gettempdir(), 'usar_cache': False,
+        'idade_maxima_cache': None,
+        'execucao': '', 'deduplicar_hardlinks': False
+    }
+
+    def arvore():
+        # Uma travessia por cliente já produz as linhas das subpastas diretas
+        auditoria = modulo.AuditoriaServidor.de_configuracao(config)
+        return auditoria.varrer_cliente
+    return arvore
+
+def listar_carga(raiz):
+    # Mesma carga para todas as versões: cada cliente e cada subpasta direta dele
+    carga = []
+    for cliente in sorted(os.scandir(raiz), key=lambda e: e.name):
+        if not cliente.is_dir() or cliente.name in PASTAS_SISTEMA:
+            continue
+        subpastas = [
+            (sub.path, sub.name, True) for sub in sorted(os.scandir(cliente.path), key=lambda e: e.name)
+            if sub.is_dir() and sub.name not in PASTAS_SISTEMA
+        ]
+        carga.append(((cliente.path, cliente.name, False), subpastas))
+    return carga
+
+def medir_por_pasta(criar_estrategia, carga):
+    processar = criar_estrategia()
+    falhas = 0
+    inicio = time.perf_counter()
+    for cliente, subpastas in carga:
+        for args in (cliente, *subpastas):
+            try:
+                if processar(*args) is None:
+                    falhas += 1
+            except Exception:
+                falhas += 1
+    return time.perf_counter() - inicio, falhas
+
+def medir_por_cliente(criar_estrategia, carga):
+    varrer_cliente = criar_estrategia()
+    falhas = 0
+    inicio = time.perf_counter()
+    for (caminho, nome, _), subpastas in carga:
+        try:
+            linhas = varrer_cliente(caminho, nome)
+            falhas += max(1 + len(subpastas) - len(linhas), 0)
+        except Exception:
+            falhas += 1 + len(subpastas)
+    return time.perf_counter() - inicio, falhas
+
+def executar_comparacao(raiz, repeticoes=3):
+    modulo = carregar_auditoria()
+    tipos_arquivos = modulo.TIPOS_PADRAO
+    carga = listar_carga(raiz)
+    pastas, arquivos = percorrer_arvore(raiz)
+    linhas = sum(1 + len(subpastas) for _, subpastas in carga)
+
+    candidatos = []
+    for caminho in listar_scripts():
+        try:
+            # Cada repetição recompila o script para zerar os lru_cache das versões 1.9-2.3
+            criar = lambda caminho=caminho: extrair_estrategia(caminho, tipos_arquivos)
+            criar()
+        except Exception as e:
+            print(f"{nome_versao(caminho)}: não foi possível extrair a varredura ({str(e)})")
+            continue
+        candidatos.append((nome_versao(caminho), criar, medir_por_pasta))
+    candidatos.append(('V2.4', estrategia_v24(modulo, raiz, tipos_arquivos), medir_por_cliente))
+
+    resultados = []
+    for nome, criar, medir in candidatos:
+        medicoes = [medir(criar, carga) for _ in range(repeticoes)]
+        segundos = statistics.median(tempo for tempo, _ in medicoes)
+        resultados.append((nome, segundos, max(falhas for _, falhas in medicoes)))
+    return pastas, arquivos, linhas, resultados
+
+def imprimir_tabela(pastas, arquivos, linhas, resultados):
+    print(f"\nÁrvore: {pastas} pastas, {arquivos} arquivos, {linhas} linhas no relatório "
+          f"(uma thread, mediana das repetições)")
+    print(f"{'Versão':<20}{'tempo (s)':>11}{'arquivos/s':>13}{'linhas/s':>11}"
+          f"{'vs anterior':>13}{'vs V2.4':>10}{'falhas':>8}")
+    referencia = resultados[-1][1]
+    anterior = None
+    for nome, segundos, falhas in resultados:
+        segundos = max(segundos, 1e-9)
+        variacao = f"{anterior / segundos - 1:+.0%}" if anterior else '-'
+        print(f"{nome:<20}{segundos:>11.3f}{arquivos / segundos:>13,.0f}{linhas / segundos:>11,.1f}"
+              f"{variacao:>13}{referencia / segundos:>9.2f}x{falhas:>8}")
+        anterior = segundos
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão da varredura de cada versão do script")
+    parser.add_argument('--root', help="árvore já existente (padrão: gera uma temporária)")
+    parser.add_argument('--clientes', type=int, default=10)
+    parser.add_argument('--subpastas', type=int, default=4)
+    parser.add_argument('--profundidade', type=int, default=3)
+    parser.add_argument('--arquivos', type=int, default=15)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    raiz = args.root
+    temporaria = None
+    if raiz is None:
+        raiz = temporaria = tempfile.mkdtemp(prefix='arvore_versoes_')
+        gerar_arvore(raiz, args.clientes, args.subpastas, args.profundidade, arquivos=args.arquivos)
+    try:
+        imprimir_tabela(*executar_comparacao(raiz, args.repeticoes))
+    finally:
+        if temporaria is not None:
+            shutil.rmtree(temporaria, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()